@@ -1,11 +1,27 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Path, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from typing import List, Optional
 from app.services.movie import MovieService
 from app.services.export import ExportService
+from app.services.query import NUMERIC_FIELDS
 from app.schemas.crawler import *
 from app.schemas.exceptions import *
 
 
+def cached_json(request: Request, etag: str, body: bytes) -> Response:
+    """JSON response with a strong ETag, or 304 when the client already has this body."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = [tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")]
+    if etag in if_none_match or "*" in if_none_match:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+SORT_PATTERN = rf"^-?({'|'.join(NUMERIC_FIELDS)})$"
+FIELD_NAMES = "|".join(MovieDetails.model_fields)
+FIELDS_PATTERN = rf"^({FIELD_NAMES})(,({FIELD_NAMES}))*$"
+
+
 # Health Router
 health_router = APIRouter(tags=["Health Check"])
 
@@ -18,7 +34,7 @@ async def health_check():
 
 # Movies Router
 movies_router = APIRouter(tags=["Movies"])
-movies_service = MovieService()
+movies_service = MovieService.from_env()
 
 # comment update moveis csv
 # @movies_router.post("/update", response_model=UpdateMoviesResponse)
@@ -28,28 +44,88 @@ movies_service = MovieService()
 
 # use this as main crawler endpoint
 @movies_router.get("/movies", response_model=SearchMoviesResponse)
-def search_movies(
+async def search_movies(
+    request: Request,
     name: Optional[str] = None,
-    genre: Optional[List[str]] = Query(default=None)
+    genre: Optional[List[str]] = Query(default=None),
+    q: Optional[str] = None,
+    stream: bool = False,
+    order: str = Query(default="completion", pattern="^(completion|rank)$")
 ):
-    """Search movies live by name or genre."""
-    return movies_service.search_movies_live(name=name, genre=genre or [])
+    """
+    Search movies live by name, genre or full-text words in title and description.
+    With `stream=1` or `Accept: application/x-ndjson` the movies are sent as NDJSON,
+    one line per movie as soon as it is ready (`order=rank` keeps rank order).
+    """
+    if stream or "application/x-ndjson" in request.headers.get("accept", ""):
+        movies = await movies_service.astream_movies(name=name, genre=genre or [], q=q, order=order)
+        async def lines():
+            async for movie in movies:
+                yield movie.model_dump_json() + "\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+    
+    etag, body = await movies_service.asearch_movies_cached(name=name, genre=genre or [], q=q)
+    return cached_json(request, etag, body)
 
 @movies_router.get("/movies/genres", response_model=GenreListResponse)
-def get_all_genres():
+async def get_all_genres(request: Request):
     """List all available genres in the movie database."""
-    return movies_service.get_all_genres()
+    etag, body = await movies_service.aget_all_genres_cached()
+    return cached_json(request, etag, body)
+
+@movies_router.get("/movies/query", response_model=MovieQueryResponse)
+async def query_movies(
+    request: Request,
+    genre: Optional[List[str]] = Query(default=None),
+    year_min: Optional[int] = None,
+    year_max: Optional[int] = None,
+    rating_min: Optional[float] = None,
+    tomato_score_min: Optional[int] = None,
+    audience_score_min: Optional[int] = None,
+    tomato_reviews_min: Optional[int] = None,
+    audience_ratings_min: Optional[int] = None,
+    sort: str = Query(default="index", pattern=SORT_PATTERN),
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=20, ge=1, le=100),
+    fields: Optional[str] = Query(default=None, pattern=FIELDS_PATTERN),
+    facets: bool = True,
+):
+    """
+    Filter movies by year range, minimum rating, scores and review counts and genres.
+    Sorted by `sort` (a numeric field, "-" prefix for descending) and paginated with
+    `offset`/`limit`; `fields` (comma-separated) trims each movie, and `facets` adds
+    genre and decade counts over all matches.
+    """
+    ranges = {
+        "year": (year_min, year_max),
+        "rating": (rating_min, None),
+        "tomato_score": (tomato_score_min, None),
+        "audience_score": (audience_score_min, None),
+        "tomato_reviews": (tomato_reviews_min, None),
+        "audience_ratings": (audience_ratings_min, None),
+    }
+    etag, body = await movies_service.aquery_movies_cached(
+        ranges=ranges, genre=genre or [], sort=sort, offset=offset, limit=limit,
+        fields=fields.split(",") if fields else None, facets=facets,
+    )
+    return cached_json(request, etag, body)
 
 @movies_router.get("/movies/{movie_name}", response_model=MovieDetails)
-def get_movie_details(movie_name: str):
-    return movies_service.get_movie_details(movie_name)
+async def get_movie_details(movie_name: str, year: Optional[int] = None):
+    """
+    Details of one movie by exact title (case, punctuation and accents are ignored).
+    `year`, or a trailing "(1999)" in the name, picks between movies sharing a title.
+    """
+    return await movies_service.aget_movie_details(movie_name, year=year)
 
 # Export Router
-# export_router = APIRouter(prefix="/movies/export", tags=["Export"])
-# export_service = ExportService()
-
-# @export_router.get("/csv")
-# def download_csv():
-#     """Download the movie database CSV."""
-#     return export_service.export_csv()
+export_router = APIRouter(prefix="/movies/export", tags=["Export"])
+export_service = movies_service.exporter
 
+@export_router.get("/{fmt}")
+def download_export(request: Request, fmt: str = Path(pattern="^(csv|ndjson|parquet)$")):
+    """
+    Download the movie database as CSV, NDJSON or Parquet.
+    Served gzip-compressed when accepted, with Range and conditional (ETag) requests.
+    """
+    return export_service.export_response(fmt, request.headers)
@@ -1,9 +1,64 @@
+import time
+
+# Startup time is measured from here, before the heavy imports
+IMPORT_STARTED = time.perf_counter()
+
+import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import *
+from app.services.cache import RefreshScheduler
+from app.services.logs import configure_logging
+from app.services.metrics import REGISTRY, collect_request_timings, record_timing, server_timing
+
+configure_logging()
+
+logger = logging.getLogger("app.main")
+
+# Seconds between background snapshot refreshes, 0 to only refresh on reads after the TTL
+REFRESH_INTERVAL = float(os.getenv("MOVIES_REFRESH_INTERVAL", os.getenv("MOVIES_SNAPSHOT_TTL", 600)))
+# Startup (import to ready) above this many seconds is logged as a warning
+STARTUP_TARGET = float(os.getenv("MOVIES_STARTUP_TARGET", 2.0))
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """
+    Serves the persisted snapshot from the first request on, and keeps it fresh with the
+    refresh scheduler. When nothing was persisted, the first request runs the first crawl.
+    """
+    ready_start = time.perf_counter()
+    warm = await asyncio.to_thread(movies_service.warm_start)
+    restored = time.perf_counter()
+    scheduler = RefreshScheduler(movies_service.snapshot, REFRESH_INTERVAL).start() if REFRESH_INTERVAL > 0 else None
 
-app = FastAPI(title="Top Movies Crawler API")
+    startup = time.perf_counter() - IMPORT_STARTED
+    record_timing("startup", startup)
+    timings = {
+        "warm": warm,
+        "import_s": round(ready_start - IMPORT_STARTED, 3),
+        "restore_s": round(restored - ready_start, 3),
+        "startup_s": round(startup, 3),
+        "target_s": STARTUP_TARGET,
+        "refresh_interval_s": REFRESH_INTERVAL,
+    }
+    if startup > STARTUP_TARGET:
+        logger.warning("Startup exceeded its target", extra=timings)
+    else:
+        logger.info("Startup complete", extra=timings)
+
+    yield
+
+    if scheduler is not None:
+        scheduler.stop()
+    movies_service.pipeline.shutdown()
+
+
+app = FastAPI(title="Top Movies Crawler API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -12,10 +67,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Server-Timing: per-stage durations of each request (fetch, parse, validate, serialize)
+if os.getenv("MOVIES_SERVER_TIMING", "0") == "1":
+    @app.middleware("http")
+    async def add_server_timing(request: Request, call_next):
+        with collect_request_timings() as timings:
+            response = await call_next(request)
+        if timings:
+            response.headers["Server-Timing"] = server_timing(timings)
+        return response
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of crawl and request metrics."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 # Include all routers
 app.include_router(health_router)
 app.include_router(movies_router)
-# app.include_router(export_router) 
+app.include_router(export_router)
 
 # Global Exception Handlers
 @app.exception_handler(NotFoundError)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, HttpUrl, field_validator
-from typing import List, Optional, Any
+from typing import Dict, List, Optional, Any
 
 
 def validate_url(v: Any):
@@ -51,4 +51,11 @@ class SearchMoviesResponse(BaseModel):
     movies: List[MovieDetails]
 
 class GenreListResponse(BaseModel):
-    genres: List[str]
\ No newline at end of file
+    genres: List[str]
+
+class MovieQueryResponse(BaseModel):
+    count: int
+    offset: int
+    limit: int
+    movies: List[Dict[str, Any]]
+    facets: Optional[Dict[str, Dict[str, int]]] = None
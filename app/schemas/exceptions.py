@@ -5,3 +5,7 @@ class NotFoundError(Exception):
 class ScraperError(Exception):
     """Raised when there is an error during scraping or processing."""
     pass
+
+class CircuitOpenError(ScraperError):
+    """Raised when a host's circuit breaker is open and the fetch is not attempted."""
+    pass
@@ -0,0 +1,132 @@
+import os
+import gzip
+import time
+import hashlib
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional, gzip is used without it
+    zstandard = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fetches (
+    url TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    content_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (url, fetched_at)
+);
+CREATE INDEX IF NOT EXISTS fetches_hash ON fetches(content_hash);
+"""
+
+EXTENSIONS = {"zstd": ".html.zst", "gzip": ".html.gz"}
+
+
+def read_blob(path: str) -> bytes:
+    """Reads and decompresses one archived page (by file extension)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.endswith(EXTENSIONS["zstd"]):
+        if zstandard is None:
+            raise RuntimeError(f"{path} is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class PageArchive:
+    """
+    Compressed, content-addressed store of raw fetched pages.
+    Each distinct body is written once under objects/<hash[:2]>/<hash>, compressed with
+    zstd when the zstandard package is installed and gzip otherwise; a SQLite index
+    records every (url, fetch time, content hash), so the pages as they were at any
+    point can be re-parsed later without fetching them again.
+    """
+
+    def __init__(self, folder="app/export/archive", compression: Optional[str] = None):
+        self.folder = folder
+        self.objects = os.path.join(folder, "objects")
+        self.db_path = os.path.join(folder, "index.db")
+        self.compression = compression or ("zstd" if zstandard is not None else "gzip")
+        if self.compression == "zstd" and zstandard is None:
+            raise RuntimeError("zstd compression needs the zstandard package")
+        self._ready = False
+        self._write_lock = threading.Lock()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        if not self._ready:
+            os.makedirs(self.objects, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            if not self._ready:
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.executescript(SCHEMA)
+                self._ready = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def content_hash(body: bytes) -> str:
+        return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+    def path(self, content_hash: str) -> Optional[str]:
+        """Path of an archived body, whichever compression it was written with."""
+        for extension in EXTENSIONS.values():
+            path = os.path.join(self.objects, content_hash[:2], content_hash + extension)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _compress(self, body: bytes) -> bytes:
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(level=10).compress(body)
+        return gzip.compress(body, compresslevel=6)
+
+    def put(self, url: str, body: bytes, fetched_at: Optional[float] = None) -> str:
+        """Archives one fetched body and returns its content hash."""
+        content_hash = self.content_hash(body)
+        if self.path(content_hash) is None:
+            folder = os.path.join(self.objects, content_hash[:2])
+            os.makedirs(folder, exist_ok=True)
+            # Written under a temporary name and renamed, so a blob is either complete or absent
+            fd, tmp = tempfile.mkstemp(dir=folder)
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._compress(body))
+            os.replace(tmp, os.path.join(folder, content_hash + EXTENSIONS[self.compression]))
+
+        with self._write_lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO fetches (url, fetched_at, content_hash, size) VALUES (?, ?, ?, ?)",
+                (url, fetched_at or time.time(), content_hash, len(body)),
+            )
+        return content_hash
+
+    def get(self, content_hash: str) -> bytes:
+        path = self.path(content_hash)
+        if path is None:
+            raise KeyError(content_hash)
+        return read_blob(path)
+
+    def latest(self, before: Optional[float] = None) -> Dict[str, str]:
+        """Maps every archived URL to the content hash of its last fetch (at or before `before`)."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                # SQLite returns the other columns of the row holding the MAX
+                "SELECT url, content_hash, MAX(fetched_at) FROM fetches WHERE fetched_at <= ? GROUP BY url",
+                (before if before is not None else float("inf"),),
+            )
+            return {url: content_hash for url, content_hash, _ in rows}
+
+    def history(self, url: str) -> List[Tuple[float, str]]:
+        """(fetch time, content hash) of every archived fetch of `url`, oldest first."""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT fetched_at, content_hash FROM fetches WHERE url = ? ORDER BY fetched_at", (url,)
+            ).fetchall()
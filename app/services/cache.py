@@ -0,0 +1,330 @@
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from app.services.metrics import record_cache, record_singleflight
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls sharing a key into one execution.
+    The first caller runs `fn`; callers arriving while it is in flight wait
+    for and share its result (or exception) instead of running `fn` again.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.calls += 1
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+        record_singleflight(key, coalesced=not leader)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._in_flight),
+            }
+
+
+class SnapshotCache:
+    """
+    Holds a single snapshot produced by `loader` for `ttl` seconds.
+    Expired snapshots keep being served while a background thread rebuilds them
+    (stale-while-revalidate); only the very first load blocks the caller.
+    Loads go through a SingleFlight, so concurrent reloads share one loader run.
+    """
+
+    def __init__(self, loader: Callable[[], Any], ttl: float = 600, flight: Optional[SingleFlight] = None, key: Hashable = "snapshot"):
+        self.loader = loader
+        self.ttl = ttl
+        self.key = key
+        self.version = 0
+        self.flight = flight or SingleFlight()
+
+        self._value: Optional[Any] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    @property
+    def has_value(self) -> bool:
+        return self._value is not None
+
+    @property
+    def is_stale(self) -> bool:
+        return self._value is None or time.monotonic() - self._loaded_at >= self.ttl
+
+    @property
+    def age(self) -> float:
+        """Seconds since the snapshot was loaded; infinite when there is none."""
+        return time.monotonic() - self._loaded_at if self._value is not None else float("inf")
+
+    def get(self) -> Any:
+        return self.get_versioned()[1]
+
+    def get_versioned(self) -> Tuple[int, Any]:
+        """Returns (version, snapshot), read together so the version always describes the snapshot."""
+        with self._lock:
+            value, version = self._value, self.version
+            record_cache(str(self.key), value is not None)
+            if value is not None and self.is_stale and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._refresh, daemon=True).start()
+
+        if value is not None:
+            return version, value
+
+        # Cold start: block until a snapshot exists
+        self.flight.do(self.key, self._load_if_empty)
+        with self._lock:
+            return self.version, self._value
+
+    async def aget(self) -> Any:
+        return (await self.aget_versioned())[1]
+
+    async def aget_versioned(self) -> Tuple[int, Any]:
+        """Async variant of get_versioned(); only a cold start waits, in a worker thread."""
+        if self._value is not None:
+            return self.get_versioned()
+        return await asyncio.to_thread(self.get_versioned)
+
+    def reload(self) -> Any:
+        """Loads a new snapshot now, joining a load already in flight if there is one."""
+        return self.flight.do(self.key, self._load)
+
+    def fill(self, loader: Callable[[], Any]) -> Any:
+        """
+        Cold start with a one-off `loader` (e.g. a crawl that is also being streamed): it runs
+        under the same SingleFlight key as the regular loads and its result is swapped in.
+        When a load is already in flight, or a snapshot exists, that one is returned instead.
+        """
+        def load() -> Any:
+            if self._value is not None:
+                return self._value
+            value = loader()
+            self.set(value)
+            return value
+
+        return self.flight.do(self.key, load)
+
+    def set(self, value: Any, age: float = 0.0) -> None:
+        """Swaps in a new snapshot and resets its TTL; `age` backdates a snapshot restored from disk."""
+        with self._lock:
+            self._value = value
+            self._loaded_at = time.monotonic() - age
+            self.version += 1
+
+    def invalidate(self, drop: bool = False) -> None:
+        """
+        Marks the snapshot as expired so the next read triggers a refresh.
+        With `drop=True` the snapshot is discarded and the next read blocks on a reload.
+        """
+        with self._lock:
+            if drop:
+                self._value = None
+            # Not 0.0: the monotonic clock starts near zero at boot, so that can still be within the TTL
+            self._loaded_at = float("-inf")
+
+    def _load(self) -> Any:
+        value = self.loader()
+        self.set(value)
+        return value
+
+    def _load_if_empty(self) -> Any:
+        # A load may have finished between the caller's check and joining the flight
+        return self._value if self._value is not None else self._load()
+
+    def _refresh(self) -> None:
+        try:
+            self.reload()
+        except Exception as e:
+            # Keep serving the stale snapshot, retry on the next read
+            logger.warning("Snapshot refresh failed", extra={"snapshot": self.key, "error": str(e)})
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+
+class RefreshScheduler:
+    """
+    Reloads a SnapshotCache every `interval` seconds from a background thread, read or not.
+    The first reload is due once the current snapshot is `interval` old. Without one it waits
+    a full `interval`: the first read does the cold load instead, so a stream can subscribe to
+    that crawl rather than wait for a scheduled one to finish. Each new snapshot is swapped in by SnapshotCache.set(), so readers get
+    the old or the new one, never a mix. A failed reload is retried after `retry` seconds.
+    """
+
+    def __init__(self, cache: SnapshotCache, interval: float, retry: float = 60):
+        self.cache = cache
+        self.interval = interval
+        self.retry = min(retry, interval)
+        self.runs = 0
+        self.failures = 0
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "RefreshScheduler":
+        self._thread = threading.Thread(target=self._run, name=f"refresh-{self.cache.key}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5) -> None:
+        """Stops scheduling; a reload in progress is left to finish in its daemon thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        delay = max(0.0, self.interval - self.cache.age) if self.cache.has_value else self.interval
+        while not self._stop.wait(delay):
+            start = time.perf_counter()
+            try:
+                self.cache.reload()
+            except Exception as e:
+                self.failures += 1
+                delay = self.retry
+                logger.warning("Scheduled snapshot refresh failed", extra={"snapshot": self.cache.key, "error": str(e)})
+            else:
+                self.runs += 1
+                delay = self.interval
+                logger.info("Scheduled snapshot refresh", extra={"snapshot": self.cache.key, "seconds": round(time.perf_counter() - start, 3)})
+
+
+class ResponseCache:
+    """
+    Bounded LRU of serialized response bodies with their strong ETags.
+    Keys should include the snapshot version, so entries for an old snapshot are
+    never served again and simply age out.
+    """
+
+    def __init__(self, maxsize: int = 256, name: str = "responses"):
+        self.maxsize = maxsize
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[Hashable, Tuple[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def etag(body: bytes) -> str:
+        return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+    def _lookup(self, key: Hashable) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            if (entry := self._entries.get(key)) is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                record_cache(self.name, True)
+                return entry
+            self.misses += 1
+            record_cache(self.name, False)
+            return None
+
+    def _store(self, key: Hashable, body: bytes) -> Tuple[str, bytes]:
+        entry = (self.etag(body), body)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def get_or_build(self, key: Hashable, build: Callable[[], bytes]) -> Tuple[str, bytes]:
+        if (entry := self._lookup(key)) is not None:
+            return entry
+        return self._store(key, build())
+
+    async def aget_or_build(self, key: Hashable, build: Callable[[], bytes]) -> Tuple[str, bytes]:
+        """Async variant of get_or_build(); a miss builds in a worker thread, off the event loop."""
+        if (entry := self._lookup(key)) is not None:
+            return entry
+        return self._store(key, await asyncio.to_thread(build))
+
+
+class TTLCache:
+    """
+    Bounded LRU mapping whose entries also expire `ttl` seconds after they were set.
+    Expired entries are dropped when read; the least recently used go first when full.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 600, name: str = "ttl"):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                record_cache(self.name, True)
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            record_cache(self.name, False)
+            return None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,270 @@
+import sys
+import json
+import time
+import struct
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from app.services.index import split_genres
+from app.services.export import atomic_open
+
+INT_FIELDS = ('index', 'year', 'tomato_score', 'tomato_reviews', 'audience_score', 'audience_ratings')
+STR_FIELDS = ('title', 'link', 'description', 'poster_img', 'cover_img', 'release_date')
+FIELDS = set(INT_FIELDS + STR_FIELDS + ('rating', 'genre', 'cast_crew'))
+
+# Stands for an absent value in the numeric columns (exact as a float too)
+MISSING = -(2 ** 62)
+
+MAGIC = b"MOVIECATALOG1\n"
+
+
+class MovieCatalog(Sequence):
+    """
+    Compact, read-only store of one snapshot of enriched movies.
+    Numeric fields live in typed arrays (one per field), genre strings are interned
+    per distinct combination with an id list and bitmask each, and cast entries point
+    into a shared, deduplicated person table. Indexing returns a freshly built movie
+    dict in the crawler's shape, so the catalog can stand in for the list of dicts.
+    """
+
+    def __init__(self, movies: Sequence[dict]):
+        self.ints: Dict[str, array] = {field: array('q') for field in INT_FIELDS}
+        self.rating = array('d')
+        self.strs: Dict[str, List[Optional[str]]] = {field: [] for field in STR_FIELDS}
+
+        # Genres: names -> ids, and each distinct genre string -> its ids and bitmask
+        self.genres: List[str] = []
+        self.genre_ids: Dict[str, int] = {}
+        self.genre_sets: List[str] = []
+        self.genre_set_ids: Dict[str, int] = {}
+        self.genre_set_members: List[Tuple[int, ...]] = []
+        self.genre_set_masks: List[int] = []
+        self.genre_ref = array('i')
+
+        # Cast: (name, img) person table and role names, with each movie's entries
+        # at cast_people/cast_roles[cast_offsets[i]:cast_offsets[i + 1]]
+        self.people: List[Tuple[str, Optional[str]]] = []
+        self.person_ids: Dict[Tuple[str, Optional[str]], int] = {}
+        self.roles: List[Optional[str]] = []
+        self.role_ids: Dict[Optional[str], int] = {}
+        self.cast_people = array('i')
+        self.cast_roles = array('i')
+        self.cast_offsets = array('q', [0])
+        self.has_cast = bytearray()
+
+        # Anything outside the known fields, kept as-is so nothing is lost
+        self.extras: Dict[int, dict] = {}
+
+        # Search and query indexes over this snapshot, by kind; built by the service before
+        # the snapshot is published, so they are swapped in (and dropped) together with it
+        self.indexes: Dict[str, Any] = {}
+
+        for movie in movies:
+            self._append(movie)
+
+    def _append(self, movie: dict) -> None:
+        i = len(self.rating)
+        for field in INT_FIELDS:
+            value = movie.get(field)
+            self.ints[field].append(MISSING if value is None else int(value))
+        rating = movie.get('rating')
+        self.rating.append(MISSING if rating is None else float(rating))
+        for field in STR_FIELDS:
+            self.strs[field].append(movie.get(field))
+
+        genre = movie.get('genre')
+        self.genre_ref.append(-1 if genre is None else self._genre_set(genre))
+
+        cast = movie.get('cast_crew')
+        self.has_cast.append(cast is not None)
+        for person in cast or []:
+            self.cast_people.append(self._intern(self.people, self.person_ids, (person.get('name'), person.get('img'))))
+            self.cast_roles.append(self._intern(self.roles, self.role_ids, person.get('role')))
+        self.cast_offsets.append(len(self.cast_people))
+
+        if extra := {key: value for key, value in movie.items() if key not in FIELDS}:
+            self.extras[i] = extra
+
+    @staticmethod
+    def _intern(values: list, ids: dict, value) -> int:
+        if (i := ids.get(value)) is None:
+            i = ids[value] = len(values)
+            values.append(value)
+        return i
+
+    def _genre_set(self, genre: str) -> int:
+        if (i := self.genre_set_ids.get(genre)) is None:
+            members = tuple(self._intern(self.genres, self.genre_ids, name) for name in dict.fromkeys(split_genres(genre)))
+            i = self._intern(self.genre_sets, self.genre_set_ids, genre)
+            self.genre_set_members.append(members)
+            self.genre_set_masks.append(sum(1 << member for member in members))
+        return i
+
+    # ==================================================================
+    # Sequence of movie dicts
+    # ==================================================================
+
+    def __len__(self) -> int:
+        return len(self.rating)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.movie(j) for j in range(*i.indices(len(self)))]
+        return self.movie(i)
+
+    def __iter__(self) -> Iterator[dict]:
+        return (self.movie(i) for i in range(len(self)))
+
+    def movie(self, i: int) -> dict:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+
+        movie = {}
+        for field in INT_FIELDS:
+            if (value := self.ints[field][i]) != MISSING:
+                movie[field] = value
+        if (rating := self.rating[i]) != MISSING:
+            movie['rating'] = int(rating) if rating.is_integer() else rating
+        for field in STR_FIELDS:
+            if (value := self.strs[field][i]) is not None:
+                movie[field] = value
+        if (ref := self.genre_ref[i]) >= 0:
+            movie['genre'] = self.genre_sets[ref]
+        if self.has_cast[i]:
+            start, end = self.cast_offsets[i], self.cast_offsets[i + 1]
+            movie['cast_crew'] = [
+                {"name": self.people[p][0], "role": self.roles[r], "img": self.people[p][1]}
+                for p, r in zip(self.cast_people[start:end], self.cast_roles[start:end])
+            ]
+        if i in self.extras:
+            movie.update(self.extras[i])
+        return movie
+
+    # ==================================================================
+    # Columnar helpers
+    # ==================================================================
+
+    def column(self, field: str) -> array:
+        """Values of one numeric field by position, MISSING where a movie has none."""
+        return self.rating if field == 'rating' else self.ints[field]
+
+    def all_genres(self) -> List[str]:
+        return sorted(self.genres)
+
+    def genre_mask(self, names: List[str]) -> Optional[int]:
+        """Bitmask of the given genre names; None when one of them is unknown."""
+        mask = 0
+        for name in names:
+            if (i := self.genre_ids.get(name.strip().lower())) is None:
+                return None
+            mask |= 1 << i
+        return mask
+
+    def with_genres(self, names: List[str]) -> List[int]:
+        """Positions of the movies carrying every genre in `names`."""
+        mask = self.genre_mask(names)
+        if mask is None:
+            return []
+        sets = {i for i, set_mask in enumerate(self.genre_set_masks) if set_mask & mask == mask}
+        return [i for i, ref in enumerate(self.genre_ref) if ref in sets]
+
+    # ==================================================================
+    # Persistence
+    # ==================================================================
+
+    def _arrays(self) -> Dict[str, array]:
+        return {
+            **{"int." + field: column for field, column in self.ints.items()},
+            "rating": self.rating, "genre_ref": self.genre_ref,
+            "cast_people": self.cast_people, "cast_roles": self.cast_roles, "cast_offsets": self.cast_offsets,
+        }
+
+    def dump(self, path: str, **meta) -> None:
+        """
+        Writes the catalog to `path` (atomically): a JSON header with the string tables and
+        `meta`, then the numeric arrays as raw bytes, which load back without any parsing.
+        """
+        arrays = self._arrays()
+        header = {
+            "meta": {"saved_at": time.time(), **meta},
+            "byteorder": sys.byteorder,
+            "arrays": [[name, column.typecode, column.itemsize, len(column)] for name, column in arrays.items()],
+            "strs": self.strs,
+            "genres": self.genres,
+            "genre_sets": self.genre_sets,
+            "genre_set_members": self.genre_set_members,
+            "people": self.people,
+            "roles": self.roles,
+            "has_cast": self.has_cast.hex(),
+            "extras": {str(i): extra for i, extra in self.extras.items()},
+        }
+        head = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        with atomic_open(path, "wb") as f:
+            f.write(MAGIC + struct.pack("<Q", len(head)) + head)
+            for column in arrays.values():
+                column.tofile(f)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple["MovieCatalog", dict]:
+        """Reads a catalog written by dump(); returns it with its meta. Raises ValueError on a foreign or truncated file."""
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a movie catalog")
+            try:
+                (size,) = struct.unpack("<Q", f.read(8))
+                header = json.loads(f.read(size).decode("utf-8"))
+
+                catalog = cls([])
+                arrays = catalog._arrays()
+                for name, typecode, itemsize, length in header["arrays"]:
+                    column = arrays[name]
+                    if column.typecode != typecode or column.itemsize != itemsize:
+                        raise ValueError(f"{path} has an incompatible {name} column")
+                    del column[:]
+                    column.fromfile(f, length)
+                    if header["byteorder"] != sys.byteorder:
+                        column.byteswap()
+            except (struct.error, EOFError) as e:
+                raise ValueError(f"{path} is truncated: {e}") from e
+
+        catalog.strs = header["strs"]
+        catalog.genres = header["genres"]
+        catalog.genre_ids = {name: i for i, name in enumerate(catalog.genres)}
+        catalog.genre_sets = header["genre_sets"]
+        catalog.genre_set_ids = {genre: i for i, genre in enumerate(catalog.genre_sets)}
+        catalog.genre_set_members = [tuple(members) for members in header["genre_set_members"]]
+        catalog.genre_set_masks = [sum(1 << member for member in members) for members in catalog.genre_set_members]
+        catalog.people = [tuple(person) for person in header["people"]]
+        catalog.person_ids = {person: i for i, person in enumerate(catalog.people)}
+        catalog.roles = header["roles"]
+        catalog.role_ids = {role: i for i, role in enumerate(catalog.roles)}
+        catalog.has_cast = bytearray.fromhex(header["has_cast"])
+        catalog.extras = {int(i): extra for i, extra in header["extras"].items()}
+        return catalog, header["meta"]
+
+    def stats(self) -> dict:
+        return {
+            "movies": len(self),
+            "genres": len(self.genres),
+            "genre_sets": len(self.genre_sets),
+            "people": len(self.people),
+            "cast_entries": len(self.cast_people),
+        }
+
+
+def deep_sizeof(obj, seen: Optional[set] = None) -> int:
+    """Approximate bytes held by `obj` and everything it references (each object counted once)."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        size += deep_sizeof(vars(obj), seen)
+    return size
@@ -0,0 +1,127 @@
+import time
+import asyncio
+import httpx
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+from app.services.header import HeaderService
+from app.services.metrics import record_fetch
+from app.services.policy import FetchPolicy
+
+
+class AsyncCrawlEngine:
+    """
+    asyncio fetcher for the crawl, used as an alternative to the ThreadPoolExecutor path.
+    One keep-alive connection pool is shared by every request made inside
+    `async with`, and each host is capped at `per_host_limit` concurrent requests.
+    With a `policy`, every request is also rate limited, retried and circuit broken.
+    """
+
+    def __init__(self, per_host_limit: int = 8, timeout: float = 10, header: Optional[HeaderService] = None, policy: Optional[FetchPolicy] = None):
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.header = header or HeaderService()
+        self.policy = policy
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self) -> "AsyncCrawlEngine":
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=None,
+                max_keepalive_connections=self.per_host_limit * 4,
+                keepalive_expiry=30,
+            ),
+        )
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self._client.aclose()
+        self._client = None
+        self._host_limits.clear()
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_limits[host]
+
+    async def fetch_response(self, url: str, headers: Optional[dict] = None) -> httpx.Response:
+        """Fetches a page with any extra (e.g. conditional) headers, without checking the status."""
+        headers = {**self.header.build_headers(), "Accept-Encoding": "gzip, deflate", **(headers or {})}
+
+        async def send() -> httpx.Response:
+            # The host slot is only held during the request, not while backing off
+            async with self._host_limit(url):
+                start = time.perf_counter()
+                response = await self._client.get(url, headers=headers)
+            record_fetch(urlsplit(url).netloc, time.perf_counter() - start, response.status_code, len(response.content))
+            return response
+
+        if self.policy is None:
+            return await send()
+        return await self.policy.acall(url, send, errors=(httpx.TransportError,))
+
+    async def fetch(self, url: str) -> str:
+        """Fetches a page and returns its decoded body. Raises httpx.HTTPError (or CircuitOpenError) on failure."""
+        response = await self.fetch_response(url)
+        response.raise_for_status()
+        return response.text
+
+
+class LiveCrawl:
+    """
+    Progress of one in-flight crawl, shared by every stream that subscribes to it.
+    The crawl calls start() with the list page rows, publish() as each movie's details
+    complete and finish() at the end; subscribers get (rank, movie) pairs in completion
+    order, including the ones published before they subscribed. Lives on one event loop.
+    """
+
+    def __init__(self):
+        self.movies: Optional[List[dict]] = None
+        self.results: Dict[int, dict] = {}
+        self.completed: List[int] = []
+        self.snapshot: Optional[Sequence[dict]] = None
+        self.error: Optional[BaseException] = None
+        self.done = False
+        # The crawl's own task, set by whoever runs it (and kept referenced while it runs)
+        self.task: Optional[asyncio.Future] = None
+
+        self._changed = asyncio.Event()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def start(self, movies: List[dict]) -> None:
+        self.movies = movies
+        self._notify()
+
+    def publish(self, rank: int, movie: dict) -> None:
+        self.results[rank] = movie
+        self.completed.append(rank)
+        self._notify()
+
+    def finish(self, snapshot: Optional[Sequence[dict]] = None, error: Optional[BaseException] = None) -> None:
+        self.snapshot, self.error, self.done = snapshot, error, True
+        self._notify()
+
+    async def started(self) -> None:
+        """Waits for the list page (or the end of the crawl, when it failed or was not ours to run)."""
+        while self.movies is None and not self.done:
+            await self._changed.wait()
+
+    async def subscribe(self) -> AsyncIterator[Tuple[int, dict]]:
+        seen = 0
+        while True:
+            while seen < len(self.completed):
+                rank = self.completed[seen]
+                seen += 1
+                yield rank, self.results[rank]
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._changed.wait()
@@ -1,16 +1,61 @@
 import os
+import re
 import csv
+import gzip
 import json
-from typing import List
-from fastapi.responses import FileResponse
+import tempfile
+from contextlib import ExitStack, contextmanager
+from email.utils import formatdate, parsedate_to_datetime
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+from fastapi.responses import Response, StreamingResponse
 from app.schemas.exceptions import NotFoundError
 
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional, Parquet export is skipped without it
+    pyarrow = None
+
+HEADERS = [
+    'index', 'rating', 'title', 'genre', 'year', 'description', 'link',
+    'poster_img', 'cover_img', 'release_date', 'tomato_score',
+    'tomato_reviews', 'audience_score', 'audience_ratings', 'cast_crew'
+]
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+
+CHUNK_SIZE = 64 * 1024
+RANGE = re.compile(r"\s*bytes=(\d*)-(\d*)\s*")
+
+
+@contextmanager
+def atomic_open(path: str, mode: str = "w", **kwargs) -> Iterator[IO]:
+    """
+    Opens a temporary file next to `path` and renames it over `path` once the block
+    completes, so readers only ever see the previous or the complete new file.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
 class ExportService:
     def __init__(self, csv_folder="app/export", csv_filename="movies.csv"):
         self.csv_folder = csv_folder
         self.csv_filename = csv_filename
         self.csv_path = os.path.join(csv_folder, csv_filename)
-        
+
+    def path(self, fmt: str) -> str:
+        """Export file path of a format ("csv", "ndjson" or "parquet")."""
+        return os.path.join(self.csv_folder, os.path.splitext(self.csv_filename)[0] + "." + fmt)
+
     def import_movies_csv(self) -> List[dict]:
         movies = []
         with open(self.csv_path, newline='', encoding='utf-8') as f:
@@ -18,21 +63,195 @@ class ExportService:
             for row in reader:
                 if 'cast_crew' in row and row['cast_crew']:
                     row['cast_crew'] = json.loads(row['cast_crew'])
-                    
+
                 for key in ['index', 'rating', 'year', 'tomato_score', 'tomato_reviews', 'audience_score', 'audience_ratings']:
                     row[key] = int(row.get(key) or 0)
                 movies.append(row)
         return movies
 
-    def export_csv(self) -> FileResponse:
+    # ==================================================================
+    # Writing
+    # ==================================================================
+
+    @contextmanager
+    def _text_outputs(self, path: str) -> Iterator[List[IO]]:
+        # The file and its precompressed .gz variant are written in the same pass
+        with ExitStack() as stack:
+            plain = stack.enter_context(atomic_open(path, "w", newline="", encoding="utf-8"))
+            raw = stack.enter_context(atomic_open(path + ".gz", "wb"))
+            compressed = stack.enter_context(gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6, mtime=0))
+            yield [plain, stack.enter_context(_TextWriter(compressed))]
+
+    def write_csv(self, movies: Iterable[dict]) -> int:
+        count = 0
+        with self._text_outputs(self.csv_path) as outputs:
+            writers = [csv.DictWriter(f, fieldnames=HEADERS, extrasaction='ignore') for f in outputs]
+            for writer in writers:
+                writer.writeheader()
+            for movie in movies:
+                # Serialize on a copy so the caller's movie keeps its cast list
+                if isinstance(movie.get('cast_crew'), list):
+                    movie = {**movie, 'cast_crew': json.dumps(movie['cast_crew'])}
+                for writer in writers:
+                    writer.writerow(movie)
+                count += 1
+        return count
+
+    def write_ndjson(self, movies: Iterable[dict]) -> int:
+        count = 0
+        with self._text_outputs(self.path("ndjson")) as outputs:
+            for movie in movies:
+                line = json.dumps({key: movie[key] for key in HEADERS if key in movie}, ensure_ascii=False) + "\n"
+                for f in outputs:
+                    f.write(line)
+                count += 1
+        return count
+
+    def write_parquet(self, movies: Iterable[dict], batch_size: int = 1024) -> int:
+        if pyarrow is None:
+            raise RuntimeError("Parquet export needs the pyarrow package")
+
+        cast = pyarrow.list_(pyarrow.struct([("name", pyarrow.string()), ("role", pyarrow.string()), ("img", pyarrow.string())]))
+        schema = pyarrow.schema(
+            [(key, pyarrow.int64()) for key in ('index', 'year', 'tomato_score', 'tomato_reviews', 'audience_score', 'audience_ratings')]
+            + [('rating', pyarrow.float64())]
+            + [(key, pyarrow.string()) for key in ('title', 'genre', 'description', 'link', 'poster_img', 'cover_img', 'release_date')]
+            + [('cast_crew', cast)]
+        )
+        count, batch = 0, []
+        with atomic_open(self.path("parquet"), "wb") as f:
+            with pyarrow.parquet.ParquetWriter(f, schema, compression="zstd") as writer:
+                # Row groups are written per batch, so memory stays flat for any catalog size
+                for movie in movies:
+                    batch.append({key: movie.get(key) for key in schema.names})
+                    if len(batch) == batch_size:
+                        writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+                        count, batch = count + len(batch), []
+                if batch:
+                    writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+                    count += len(batch)
+        return count
+
+    def export_movies(self, movies: List[dict], formats: Tuple[str, ...] = ("csv", "ndjson", "parquet")) -> Dict[str, int]:
+        """Writes every available format; returns the rows written per format."""
+        writers = {"csv": self.write_csv, "ndjson": self.write_ndjson, "parquet": self.write_parquet}
+        os.makedirs(self.csv_folder, exist_ok=True)
+        return {
+            fmt: writers[fmt](movies)
+            for fmt in formats if fmt != "parquet" or pyarrow is not None
+        }
+
+    # ==================================================================
+    # Serving
+    # ==================================================================
+
+    def export_response(self, fmt: str, headers) -> Response:
         """
-        Returns the CSV file as a downloadable response.
+        Serves an export file with conditional request (ETag / Last-Modified) and single
+        byte Range support, using the precompressed .gz variant when the client accepts gzip.
         """
-        if not os.path.exists(self.csv_path):
-            raise NotFoundError(f"No CSV file found at {self.csv_path}. Please update the database first.")
+        path = self.path(fmt)
+        if fmt == "parquet" and pyarrow is None and not os.path.exists(path):
+            raise NotFoundError("Parquet export is not available, it needs the pyarrow package.")
 
-        return FileResponse(
-            path=self.csv_path,
-            media_type="text/csv",
-            filename=self.csv_filename
-        )
+        # Headers and body come from one open file: a refresh renaming a new export
+        # into place mid-request cannot mix its size or ETag with the old bytes
+        f, encoding = None, None
+        if "gzip" in headers.get("accept-encoding", ""):
+            try:
+                f, encoding = open(path + ".gz", "rb"), "gzip"
+            except FileNotFoundError:
+                pass
+        if f is None:
+            try:
+                f = open(path, "rb")
+            except FileNotFoundError:
+                raise NotFoundError(f"No {fmt.upper()} export found at {path}. Please update the database first.")
+
+        stat = os.fstat(f.fileno())
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}{"-gz" if encoding else ""}"'
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+        response_headers = {
+            "ETag": etag,
+            "Last-Modified": last_modified,
+            "Accept-Ranges": "bytes",
+            "Vary": "Accept-Encoding",
+            "Content-Disposition": f'attachment; filename="{os.path.basename(self.path(fmt))}"',
+        }
+        if encoding:
+            response_headers["Content-Encoding"] = encoding
+
+        if _not_modified(headers, etag, stat.st_mtime):
+            f.close()
+            return Response(status_code=304, headers=response_headers)
+
+        start, end = 0, stat.st_size - 1
+        status = 200
+        range_header = headers.get("range")
+        # Multiple ranges are not supported; like an unparsable Range, they get the whole file
+        if range_header and RANGE.fullmatch(range_header) and _if_range_matches(headers.get("if-range"), etag, last_modified):
+            byte_range = _parse_range(range_header, stat.st_size)
+            if byte_range is None:
+                f.close()
+                return Response(status_code=416, headers={**response_headers, "Content-Range": f"bytes */{stat.st_size}"})
+            start, end = byte_range
+            status = 206
+            response_headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+
+        response_headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(_read_range(f, start, end), status_code=status, media_type=MEDIA_TYPES[fmt], headers=response_headers)
+
+
+class _TextWriter:
+    """Minimal text wrapper over a binary file, for the csv module and json lines."""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def write(self, text: str) -> int:
+        return self.raw.write(text.encode("utf-8"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+def _not_modified(headers, etag: str, mtime: float) -> bool:
+    if (if_none_match := headers.get("if-none-match")) is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return etag in tags or "*" in tags
+    if (if_modified_since := headers.get("if-modified-since")) is not None:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _if_range_matches(if_range: Optional[str], etag: str, last_modified: str) -> bool:
+    # Without If-Range the range always applies; with it, only while the file is unchanged
+    return if_range is None or if_range.strip() in (etag, last_modified)
+
+
+def _parse_range(value: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parses a single `bytes=` range matching RANGE; None when it cannot be satisfied."""
+    first, last = RANGE.fullmatch(value).groups()
+    if first == last == "":
+        return None
+    if first == "":
+        # Suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    return (start, end) if start <= end and start < size else None
+
+
+def _read_range(f: IO[bytes], start: int, end: int) -> Iterator[bytes]:
+    with f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0 and (chunk := f.read(min(CHUNK_SIZE, remaining))):
+            remaining -= len(chunk)
+            yield chunk
@@ -0,0 +1,90 @@
+import re
+import unicodedata
+from typing import Dict, List, Optional, Set
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip accents and collapse punctuation/whitespace to single spaces."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"[\W_]+", " ", text.lower()).strip()
+
+
+def split_genres(genre: Optional[str]) -> List[str]:
+    return [g for g in (part.strip().lower() for part in (genre or "").split(",")) if g]
+
+
+def movie_matches(movie: dict, name: Optional[str] = None, genre: Optional[List[str]] = None) -> bool:
+    """Un-indexed check of a single movie, with the same semantics as MovieIndex.search."""
+    if genre and not {g.strip().lower() for g in genre} <= set(split_genres(movie.get("genre"))):
+        return False
+    query = normalize_text(name) if name else ""
+    return not query or query in normalize_text(movie.get("title", ""))
+
+
+class MovieIndex:
+    """
+    Search index over one snapshot of enriched movies, built once and then read-only.
+    Titles are indexed by every 1- to 3-character gram of their normalized form, and
+    genres by exact (lowercased) name, both as posting sets of positions in `movies`.
+    Whole normalized titles map to their positions for exact lookups.
+    """
+
+    GRAM = 3
+
+    def __init__(self, movies: List[dict]):
+        self.movies = movies
+        self.titles: List[str] = []
+        self.grams: Dict[str, Set[int]] = {}
+        self.genres: Dict[str, Set[int]] = {}
+        self.exact: Dict[str, List[int]] = {}
+
+        for i, movie in enumerate(movies):
+            title = normalize_text(movie.get("title", ""))
+            self.titles.append(title)
+            self.exact.setdefault(title, []).append(i)
+            for gram in self._grams(title):
+                self.grams.setdefault(gram, set()).add(i)
+            for g in split_genres(movie.get("genre")):
+                self.genres.setdefault(g, set()).add(i)
+
+    def _grams(self, text: str) -> Set[str]:
+        return {text[i:i + n] for n in range(1, self.GRAM + 1) for i in range(len(text) - n + 1)}
+
+    def _title_candidates(self, query: str) -> Set[int]:
+        # Every gram of the query must appear in the title, longest grams are the most selective
+        n = min(len(query), self.GRAM)
+        postings = [self.grams.get(query[i:i + n], set()) for i in range(len(query) - n + 1)]
+        return set.intersection(*sorted(postings, key=len))
+
+    def search(self, name: Optional[str] = None, genre: Optional[List[str]] = None) -> List[dict]:
+        """Returns movies whose title contains `name` and that carry every genre in `genre`, in rank order."""
+        postings = []
+
+        if genre:
+            postings.extend(self.genres.get(g.strip().lower(), set()) for g in genre)
+
+        query = normalize_text(name) if name else ""
+        if query:
+            candidates = self._title_candidates(query)
+            # Grams only prove the pieces are present; confirm the whole substring
+            postings.append({i for i in candidates if query in self.titles[i]})
+
+        if not postings:
+            return list(self.movies)
+
+        matches = set.intersection(*sorted(postings, key=len))
+        return [self.movies[i] for i in sorted(matches)]
+
+    def lookup(self, name: str, year: Optional[int] = None) -> Optional[dict]:
+        """
+        Returns the best ranked movie whose normalized title equals `name`, or None.
+        `year` picks between movies sharing a title.
+        """
+        for i in self.exact.get(normalize_text(name), []):
+            if year is None or self.movies[i].get("year") == year:
+                return self.movies[i]
+        return None
+
+    def all_genres(self) -> List[str]:
+        return sorted(self.genres)
@@ -0,0 +1,198 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawls (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    crawl_id TEXT NOT NULL REFERENCES crawls(id),
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    not_before REAL NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    UNIQUE (crawl_id, kind, url)
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs(crawl_id, state, not_before);
+"""
+
+STATES = ("pending", "leased", "done", "failed")
+
+
+class Job:
+    __slots__ = ("id", "crawl_id", "kind", "url", "position", "attempts")
+
+    def __init__(self, id, crawl_id, kind, url, position, attempts):
+        self.id = id
+        self.crawl_id = crawl_id
+        self.kind = kind
+        self.url = url
+        self.position = position
+        self.attempts = attempts
+
+
+class JobQueue:
+    """
+    Durable crawl job queue in SQLite, shared by every worker process that can open the file.
+    A crawl is a set of jobs (one per list page, then one per detail link). Workers claim
+    jobs under a lease; a job whose lease runs out (its worker died) is handed out again,
+    and a failed job is retried with backoff until `max_attempts`. Results are checkpointed
+    on the job as soon as it completes, so an interrupted crawl resumes where it stopped.
+    """
+
+    def __init__(self, db_folder="app/export", db_filename="jobs.db", lease: float = 120, max_attempts: int = 3,
+                 backoff: float = 2, stale_after: float = 3600, keep: int = 3):
+        self.db_folder = db_folder
+        self.db_path = os.path.join(db_folder, db_filename)
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        # Unfinished crawls older than this are abandoned instead of resumed
+        self.stale_after = stale_after
+        # Finished crawls kept (with their jobs) for inspection
+        self.keep = keep
+        self._ready = False
+
+    @contextmanager
+    def _connect(self, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+        if not self._ready:
+            os.makedirs(self.db_folder, exist_ok=True)
+        # Autocommit mode: transactions are opened explicitly below
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            if not self._ready:
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.executescript(SCHEMA)
+                self._ready = True
+            # A checkpoint survives the process dying; losing the last ones on power loss only costs a refetch
+            conn.execute("PRAGMA synchronous = NORMAL")
+            # IMMEDIATE takes the write lock up front, so two workers never claim the same job
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    # ==================================================================
+    # Crawls
+    # ==================================================================
+
+    def open_crawl(self, list_urls: List[str]) -> Tuple[str, bool]:
+        """
+        Returns (crawl id, resumed): the unfinished crawl if one exists, else a new crawl
+        with one list job per URL. List URLs added since a crawl started are queued on resume.
+        """
+        now = time.time()
+        with self._connect(immediate=True) as conn:
+            conn.execute("UPDATE crawls SET finished_at = ? WHERE finished_at IS NULL AND created_at < ?", (now, now - self.stale_after))
+            row = conn.execute("SELECT id FROM crawls WHERE finished_at IS NULL ORDER BY created_at DESC LIMIT 1").fetchone()
+            resumed = row is not None
+            crawl_id = row[0] if resumed else uuid.uuid4().hex
+            if not resumed:
+                self._prune(conn)
+                conn.execute("INSERT INTO crawls (id, created_at) VALUES (?, ?)", (crawl_id, now))
+            self._add(conn, crawl_id, "list", list(zip(list_urls, range(len(list_urls)))))
+        return crawl_id, resumed
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        old = "SELECT id FROM crawls WHERE finished_at IS NOT NULL ORDER BY created_at DESC LIMIT -1 OFFSET ?"
+        conn.execute(f"DELETE FROM jobs WHERE crawl_id IN ({old})", (self.keep,))
+        conn.execute(f"DELETE FROM crawls WHERE id IN ({old})", (self.keep,))
+
+    def current_crawl(self) -> Optional[str]:
+        """The unfinished crawl workers should join, if any."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT id FROM crawls WHERE finished_at IS NULL ORDER BY created_at DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def finish_crawl(self, crawl_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("UPDATE crawls SET finished_at = ? WHERE id = ?", (time.time(), crawl_id))
+
+    # ==================================================================
+    # Jobs
+    # ==================================================================
+
+    @staticmethod
+    def _add(conn: sqlite3.Connection, crawl_id: str, kind: str, jobs: List[Tuple[str, int]]) -> None:
+        conn.executemany(
+            "INSERT OR IGNORE INTO jobs (crawl_id, kind, url, position) VALUES (?, ?, ?, ?)",
+            [(crawl_id, kind, url, position) for url, position in jobs],
+        )
+
+    def claim(self, crawl_id: str, owner: str, limit: int = 1) -> List[Job]:
+        """Leases up to `limit` runnable jobs (pending, or leased with an expired lease) to `owner`."""
+        now = time.time()
+        with self._connect(immediate=True) as conn:
+            # A lease that expired on its last attempt means the job keeps killing its worker
+            conn.execute(
+                "UPDATE jobs SET state = 'failed', error = 'Lease expired' "
+                "WHERE crawl_id = ? AND state = 'leased' AND not_before <= ? AND attempts >= ?",
+                (crawl_id, now, self.max_attempts),
+            )
+            rows = conn.execute(
+                "SELECT id, crawl_id, kind, url, position, attempts FROM jobs "
+                "WHERE crawl_id = ? AND state IN ('pending', 'leased') AND not_before <= ? "
+                "ORDER BY kind = 'detail', position LIMIT ?",
+                (crawl_id, now, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE jobs SET state = 'leased', owner = ?, attempts = attempts + 1, not_before = ? WHERE id = ?",
+                [(owner, now + self.lease, row[0]) for row in rows],
+            )
+        return [Job(*row[:5], row[5] + 1) for row in rows]
+
+    def complete(self, job: Job, owner: str, result: Any, children: Optional[List[Tuple[str, int]]] = None,
+                 child_kind: str = "detail") -> bool:
+        """
+        Checkpoints a job's result and queues its follow-up jobs in one transaction.
+        Returns False when the lease was lost (expired and claimed again), so nothing is written.
+        """
+        with self._connect(immediate=True) as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET state = 'done', result = ?, error = NULL WHERE id = ? AND owner = ? AND state = 'leased'",
+                (json.dumps(result), job.id, owner),
+            ).rowcount
+            if updated and children:
+                self._add(conn, job.crawl_id, child_kind, children)
+        return bool(updated)
+
+    def fail(self, job: Job, owner: str, error: str) -> None:
+        """Puts a job back with exponential backoff, or marks it failed after `max_attempts`."""
+        final = job.attempts >= self.max_attempts
+        with self._connect(immediate=True) as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, not_before = ? WHERE id = ? AND owner = ? AND state = 'leased'",
+                ("failed" if final else "pending", error, time.time() + self.backoff * 2 ** (job.attempts - 1), job.id, owner),
+            )
+
+    def counts(self, crawl_id: str) -> Dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT state, COUNT(*) FROM jobs WHERE crawl_id = ? GROUP BY state", (crawl_id,)).fetchall()
+        return {state: 0 for state in STATES} | dict(rows)
+
+    def results(self, crawl_id: str, kind: str) -> Dict[str, Optional[Any]]:
+        """Result of every job of `kind` by URL, in position order; None unless the job is done."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT url, result, state FROM jobs WHERE crawl_id = ? AND kind = ? ORDER BY position",
+                (crawl_id, kind),
+            ).fetchall()
+        return {url: json.loads(result) if state == "done" else None for url, result, state in rows}
@@ -0,0 +1,28 @@
+import os
+import json
+import logging
+
+
+class StructuredFormatter(logging.Formatter):
+    """One line per record: logfmt-style key=value pairs, including any `extra` fields."""
+
+    RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {
+            "ts": self.formatTime(record),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+            **{key: value for key, value in vars(record).items() if key not in self.RESERVED},
+        }
+        if record.exc_info:
+            fields["exc"] = self.formatException(record.exc_info)
+        return " ".join(f"{key}={json.dumps(value, default=str, ensure_ascii=False)}" for key, value in fields.items())
+
+
+def configure_logging() -> None:
+    """Structured logs on stderr at LOG_LEVEL (default INFO), for the API and the worker alike."""
+    handler = logging.StreamHandler()
+    handler.setFormatter(StructuredFormatter())
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), handlers=[handler])
@@ -0,0 +1,171 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Fields DetailPageParser extracts; a page without one counts as a miss for that field
+DETAIL_FIELDS = (
+    "poster_img", "description", "genre", "release_date", "cover_img", "tomato_score",
+    "tomato_reviews", "audience_score", "audience_ratings", "cast_crew",
+)
+
+# Stage durations of the current request, collected for its Server-Timing header
+_request_timings: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("request_timings", default=None)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels.get(name, "")) for name in self.labels), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labels, key)} {int(value) if value == int(value) else value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (non-cumulative, last is +Inf), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, _ = entry = self._values.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0])
+            counts[i] += 1
+            entry[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                    lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.labels, key)} {total:.6f}")
+                lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List = []
+
+    def counter(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labels, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format."""
+        return "\n".join(line for metric in self.metrics for line in metric.render()) + "\n"
+
+
+REGISTRY = Registry()
+
+FETCH_SECONDS = REGISTRY.histogram("movies_fetch_seconds", "Upstream request latency per attempt.", ("host",))
+FETCH_BYTES = REGISTRY.counter("movies_fetch_bytes_total", "Response body bytes downloaded from upstream.", ("host",))
+FETCH_RESPONSES = REGISTRY.counter("movies_fetch_responses_total", "Upstream responses by status code.", ("host", "status"))
+STAGE_SECONDS = REGISTRY.histogram("movies_stage_seconds", "Time spent per item in each processing stage.", ("stage",))
+PARSE_MISSES = REGISTRY.counter("movies_parse_misses_total", "Pages or rows the parsers found no value in, per field.", ("field",))
+CACHE_REQUESTS = REGISTRY.counter("movies_cache_requests_total", "Cache lookups by cache and result (hit or miss).", ("cache", "result"))
+SINGLEFLIGHT = REGISTRY.counter("movies_singleflight_total", "SingleFlight calls by key and result (executed or coalesced).", ("key", "result"))
+
+
+def record_timing(stage: str, seconds: float) -> None:
+    """Records a stage duration, and adds it to the current request's Server-Timing if one is collected."""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    if (timings := _request_timings.get()) is not None:
+        timings.setdefault(stage, []).append(seconds)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(stage, time.perf_counter() - start)
+
+
+def record_fetch(host: str, seconds: float, status: int, size: int) -> None:
+    FETCH_SECONDS.observe(seconds, host=host)
+    FETCH_BYTES.inc(size, host=host)
+    FETCH_RESPONSES.inc(host=host, status=status)
+    if (timings := _request_timings.get()) is not None:
+        timings.setdefault("fetch", []).append(seconds)
+
+
+def record_parse(details: dict, seconds: Optional[float] = None) -> None:
+    if seconds is not None:
+        record_timing("parse", seconds)
+    for field in DETAIL_FIELDS:
+        if field not in details:
+            PARSE_MISSES.inc(field=field)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def record_singleflight(key, coalesced: bool) -> None:
+    SINGLEFLIGHT.inc(key=str(key), result="coalesced" if coalesced else "executed")
+
+
+@contextmanager
+def collect_request_timings() -> Iterator[Dict[str, List[float]]]:
+    """Collects the stage durations recorded while handling one request."""
+    token = _request_timings.set({})
+    try:
+        yield _request_timings.get()
+    finally:
+        _request_timings.reset(token)
+
+
+def server_timing(timings: Dict[str, List[float]]) -> str:
+    """Formats collected timings as a Server-Timing header value (total milliseconds per stage)."""
+    return ", ".join(
+        f'{stage};dur={sum(values) * 1000:.2f};desc="{len(values)}x"' for stage, values in timings.items()
+    )
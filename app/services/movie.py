@@ -1,26 +1,88 @@
 import os
+import time
+import logging
+import asyncio
+import httpx
 import requests
-import csv
+import sqlite3
 import re
-import json
 import random
-from typing import List
-from pydantic import TypeAdapter
+import socket
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+from pydantic import TypeAdapter, ValidationError
+from requests.adapters import HTTPAdapter
 from concurrent.futures import ThreadPoolExecutor
 from app.services.header import *
 from app.schemas.exceptions import *
 from app.schemas.crawler import *
 from app.services.export import *
+from app.services.cache import ResponseCache, SingleFlight, SnapshotCache, TTLCache
+from app.services.crawler import AsyncCrawlEngine, LiveCrawl
+from app.services.policy import FetchPolicy
+from app.services.metrics import PARSE_MISSES, record_fetch, record_parse, timed
+from app.services.parser import DetailPageParser
+from app.services.pipeline import CrawlPipeline, parse_archived_page
+from app.services.archive import PageArchive
+from app.services.jobs import Job, JobQueue
+from app.services.catalog import MovieCatalog
+from app.services.index import MovieIndex, movie_matches, normalize_text
+from app.services.query import QueryIndex
+from app.services.store import MovieStore
+from app.services.revalidate import PageCache
 
+logger = logging.getLogger(__name__)
 
 class MovieService:
-    def __init__(self):
+    def __init__(self, snapshot_ttl: float = 600, crawl_engine: str = "thread", per_host_limit: int = 8, rate_limit: float = 20,
+                 archive: bool = False, list_urls: Optional[List[str]] = None):
         
         self.base_url = "https://editorial.rottentomatoes.com/guide/best-movies-of-all-time/"
+        # More list pages to crawl after base_url; a link on several lists keeps its first row
+        self.extra_list_urls = list(list_urls or [])
         self.exporter = ExportService()
-        self.session = requests.Session()
+        self.store = MovieStore()
         self.header = HeaderService()
         
+        # "thread" crawls with a ThreadPoolExecutor, "async" with AsyncCrawlEngine,
+        # "process" with CrawlPipeline (threaded fetch, process-pool parse),
+        # "reparse" rebuilds the movies from the page archive without fetching,
+        # "queue" runs list and detail jobs from a durable queue shared with `python -m app.worker`
+        self.crawl_engine = crawl_engine
+        self.job_queue = JobQueue()
+        self.archive = PageArchive() if archive or crawl_engine == "reparse" else None
+        # Content hash of the last archived body of each link, loaded on first use
+        self._archived: Optional[Dict[str, str]] = None
+        self.per_host_limit = per_host_limit
+        self.max_workers = os.cpu_count() * 2
+        
+        # Size the connection pool to the worker count so connections are reused, not discarded
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # Requests per second per host; slows down on 429/503 and opens a circuit on repeated failures
+        self.fetch_policy = FetchPolicy(rate=rate_limit)
+        self.crawl_flight = SingleFlight()
+        # The last snapshot is persisted here, so a restart serves it while a new one is crawled
+        self.snapshot_path = "app/export/snapshot.bin"
+        self.snapshot = SnapshotCache(self._load_snapshot, ttl=snapshot_ttl, flight=self.crawl_flight)
+        # Single movie lookups only need the list page, plus the details of the one movie
+        self.list_snapshot = SnapshotCache(self._load_list_snapshot, ttl=snapshot_ttl, flight=self.crawl_flight, key="movie_list")
+        self.details_cache = TTLCache(maxsize=512, ttl=snapshot_ttl, name="details")
+        self.detail_parser = DetailPageParser()
+        self.page_cache = PageCache()
+        self.pipeline = CrawlPipeline(self._fetch_detail_page, fetch_workers=self.max_workers, remember=self.page_cache.remember)
+        # Indexes of movie lists that are not a snapshot catalog (those carry their own)
+        self._indexes: Dict[str, Any] = {}
+        # The cold-start crawl that concurrent streams subscribe to, while it runs
+        self._live_crawl: Optional[LiveCrawl] = None
+        
+        # Validators are compiled once here instead of on every request
+        self.movie_adapter = TypeAdapter(MovieDetails)
+        self.movies_adapter = TypeAdapter(List[MovieDetails])
+        self.responses = ResponseCache()
+        
         self.page1_pattern = {
             "row": re.compile(r"<tr.*?>(.*?)</tr>", re.S),
             "td": re.compile(r"<td.*?>(.*?)</td>", re.S),
@@ -60,20 +122,131 @@ class MovieService:
             }
         }
 
+    @classmethod
+    def from_env(cls) -> "MovieService":
+        """Builds the service from the MOVIES_* environment variables."""
+        return cls(
+            snapshot_ttl=float(os.getenv("MOVIES_SNAPSHOT_TTL", 600)),
+            crawl_engine=os.getenv("MOVIES_CRAWL_ENGINE", "thread"),
+            per_host_limit=int(os.getenv("MOVIES_PER_HOST_LIMIT", 8)),
+            rate_limit=float(os.getenv("MOVIES_RATE_LIMIT", 20)),
+            archive=os.getenv("MOVIES_ARCHIVE", "0") == "1",
+            list_urls=[url.strip() for url in os.getenv("MOVIES_LIST_URLS", "").split(",") if url.strip()],
+        )
+
     # ==================================================================
     # Internal Scraping Logic
     # ==================================================================
 
+    def _list_urls(self) -> List[str]:
+        return list(dict.fromkeys([self.base_url, *self.extra_list_urls]))
+
+    @staticmethod
+    def _merge_movie_lists(lists: List[List[dict]]) -> List[dict]:
+        """Concatenates list pages in order, keeping the first row of a link found on several."""
+        movies, seen = [], set()
+        for rows in lists:
+            for movie in rows:
+                if movie['link'] not in seen:
+                    seen.add(movie['link'])
+                    movies.append(movie)
+        return movies
+
+    def _get(self, url, headers) -> requests.Response:
+        def send() -> requests.Response:
+            start = time.perf_counter()
+            response = self.session.get(url, headers=headers, timeout=10)
+            record_fetch(urlsplit(url).netloc, time.perf_counter() - start, response.status_code, len(response.content))
+            return response
+
+        return self.fetch_policy.call(url, send, errors=(requests.ConnectionError, requests.Timeout))
+
+    def _archive_page(self, url, body: bytes) -> None:
+        if self.archive is None:
+            return
+        try:
+            content_hash = self.archive.put(url, body)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("Failed to archive page", extra={"link": url, "error": str(e)})
+            return
+        if self._archived is not None:
+            self._archived[url] = content_hash
+
+    def _conditional_headers(self, url) -> dict:
+        """
+        Validators for a detail page. With the archive on, a page whose current body is not
+        archived (e.g. the archive was enabled after validators were stored) is fetched
+        unconditionally, since a 304 carries no body to archive and reparse would lose it.
+        """
+        if self.archive is not None:
+            if self._archived is None:
+                try:
+                    self._archived = self.archive.latest()
+                except sqlite3.Error as e:
+                    logger.warning("Failed to read the page archive index", extra={"error": str(e)})
+                    return {}
+            entry = self.page_cache.entries.get(url)
+            if entry is None or self._archived.get(url) != entry.content_hash:
+                return {}
+        return self.page_cache.conditional_headers(url)
+
+    def _fetch_page(self, url) -> str:
+        response = self._get(url, self.header.build_headers())
+        response.raise_for_status()
+        self._archive_page(url, response.content)
+        return response.text
+
+    def _fetch_detail_page(self, url) -> Tuple[Optional[str], Optional[dict]]:
+        """
+        Conditionally fetches a detail page.
+        Returns (html, None) when it must be parsed, or (None, details) when the page is unchanged.
+        """
+        headers = {**self.header.build_headers(), **self._conditional_headers(url)}
+        try:
+            response = self._get(url, headers)
+            if response.status_code != 304:
+                response.raise_for_status()
+            
+        except (requests.RequestException, CircuitOpenError):
+            self.page_cache.fail()
+            return None, None
+        
+        if response.status_code == 200:
+            self._archive_page(url, response.content)
+        if (details := self.page_cache.resolve(url, response.status_code, response.headers, response.content)) is not None:
+            return None, details
+        return response.text, None
+
     def _crawl_movie_list(self) -> List[dict]:
         try:
-            response = self.session.get(self.base_url, headers=self.header.build_headers(), timeout=10)
-            response.raise_for_status()
+            html = self._fetch_page(self.base_url)
             
         except requests.RequestException as e:
             raise ScraperError(f"Failed to fetch movie list: {str(e)}")
-            
+        
+        lists = [self._parse_movie_list(html)]
+        for url in self._list_urls()[1:]:
+            try:
+                lists.append(self._parse_movie_list(self._fetch_page(url)))
+            except (requests.RequestException, NotFoundError, CircuitOpenError) as e:
+                logger.warning("Skipping additional movie list", extra={"link": url, "error": str(e)})
+        return self._merge_movie_lists(lists)
+
+    def _crawl_movie_details(self, url) -> dict:
+        
+        html, details = self._fetch_detail_page(url)
+        if details is not None:
+            return details
+        if html is None:
+            return {}
+        
+        details = self._parse_movie_details(html)
+        self.page_cache.remember(url, details)
+        return details
+
+    def _parse_movie_list(self, html) -> List[dict]:
         movies = []
-        for row in self.page1_pattern["row"].findall(response.text):
+        for row in self.page1_pattern["row"].findall(html):
             try:
                 td = self.page1_pattern["td"].findall(row)
                 idx = int(float(td[0].strip()))
@@ -84,6 +257,7 @@ class MovieService:
                 rating = int(self.page1_pattern["score"].search(td[1].strip()).group(1))
                 movies.append({"index": idx, "rating": rating, "title": title, "link": link, "year": year})
             except (AttributeError, IndexError, ValueError):
+                PARSE_MISSES.inc(field="list_row")
                 continue
             
         if not movies:
@@ -91,16 +265,14 @@ class MovieService:
         
         return movies
 
-    def _crawl_movie_details(self, url) -> dict:
-        
-        try:
-            response = self.session.get(url, headers=self.header.build_headers(), timeout=10)
-            response.raise_for_status()
-            
-        except requests.RequestException as e:
-            return {}
-        
-        html = response.text
+    def _parse_movie_details(self, html) -> dict:
+        start = time.perf_counter()
+        details = self.detail_parser.parse(html)
+        record_parse(details, time.perf_counter() - start)
+        return details
+
+    def _parse_movie_details_regex(self, html) -> dict:
+        """Reference parser built on `page2_pattern`, kept to check and benchmark DetailPageParser."""
         details = {}
         
         if (poster_match := self.page2_pattern["poster_img"].search(html)):
@@ -146,24 +318,324 @@ class MovieService:
         
         return details
             
-    def _get_all_enriched_movies(self) -> List[dict]:
+    def _import_csv_fallback(self, error: ScraperError) -> List[dict]:
+        if os.path.exists(self.store.db_path) and self.store.count():
+            logger.warning("Using existing SQLite database due to scraping error", extra={"error": str(error)})
+            return self.store.load_movies()
+        if os.path.exists(self.exporter.csv_path):
+            logger.warning("Using existing CSV database due to scraping error", extra={"error": str(error)})
+            return self.exporter.import_movies_csv()
+        raise error
+
+    def _reparse_archive(self) -> List[dict]:
+        """
+        Rebuilds the enriched movies from the latest archived list and detail pages,
+        parsing in the process pool without fetching anything. Re-parsed details also
+        replace the remembered ones, so the next conditional crawl reuses them.
+        """
+        latest = self.archive.latest()
+        if self.base_url not in latest:
+            raise ScraperError("No archived movie list to reparse.")
+        movies = self._merge_movie_lists([
+            self._parse_movie_list(self.archive.get(latest[url]).decode("utf-8", errors="replace"))
+            for url in self._list_urls() if url in latest
+        ])
+        
+        paths = {movie['link']: self.archive.path(latest[movie['link']]) for movie in movies if movie['link'] in latest}
+        links = [link for link, path in paths.items() if path is not None]
+        try:
+            chunksize = max(1, len(links) // (self.pipeline.parse_workers * 4))
+            results = list(self.pipeline.pool.map(parse_archived_page, [paths[link] for link in links], chunksize=chunksize))
+        except Exception as e:
+            logger.warning("Parse pool unavailable, reparsing inline", extra={"error": str(e)})
+            results = [parse_archived_page(paths[link]) for link in links]
+        
+        details = {}
+        for link, (parsed, seconds) in zip(links, results):
+            record_parse(parsed, seconds)
+            details[link] = parsed
+            if (entry := self.page_cache.entries.get(link)) is not None:
+                entry.details = parsed
+        
+        for movie in movies:
+            movie.update(details.get(movie['link'], {}))
+        logger.info("Reparsed archive", extra={"movies": len(movies), "pages": len(details), "missing": len(movies) - len(details)})
+        return movies
+
+    def _run_job(self, job: Job, owner: str) -> None:
+        try:
+            if job.kind == "list":
+                movies = self._parse_movie_list(self._fetch_page(job.url))
+                # Detail jobs follow their list's rank order, lists in the order they were given
+                children = [(movie['link'], job.position * 100000 + i) for i, movie in enumerate(movies)]
+                self.job_queue.complete(job, owner, movies, children)
+                return
+            
+            html, details = self._fetch_detail_page(job.url)
+            if html is None and details is None:
+                self.job_queue.fail(job, owner, "Failed to fetch detail page")
+                return
+            if details is None:
+                details = self._parse_movie_details(html)
+                self.page_cache.remember(job.url, details)
+            self.job_queue.complete(job, owner, details)
+            
+        except (requests.RequestException, CircuitOpenError, NotFoundError) as e:
+            self.job_queue.fail(job, owner, str(e))
+        except Exception as e:
+            # e.g. a parser or SQLite error: retried with backoff like a fetch error, and the worker thread lives on
+            logger.warning("Queue job failed", extra={"kind": job.kind, "link": job.url, "error": repr(e)})
+            self.job_queue.fail(job, owner, repr(e))
+
+    def run_queue_worker(self, crawl_id: str, owner: str, poll: float = 0.05) -> int:
+        """
+        Claims and runs jobs of `crawl_id` until every job is done or failed; returns how many it ran.
+        Waits while jobs are leased elsewhere or backing off, since they may still add work.
+        """
+        ran = 0
+        while True:
+            if jobs := self.job_queue.claim(crawl_id, owner):
+                for job in jobs:
+                    self._run_job(job, owner)
+                ran += len(jobs)
+                continue
+            counts = self.job_queue.counts(crawl_id)
+            if not counts["pending"] and not counts["leased"]:
+                return ran
+            time.sleep(poll)
+
+    def run_queue_workers(self, crawl_id: str, threads: Optional[int] = None) -> int:
+        """Runs `threads` queue workers in this process; each is its own lease owner."""
+        threads = threads or self.max_workers
+        owner = f"{socket.gethostname()}:{os.getpid()}"
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            return sum(executor.map(lambda i: self.run_queue_worker(crawl_id, f"{owner}:{i}"), range(threads)))
+
+    def _crawl_queue(self) -> List[dict]:
+        """
+        Crawls through the durable job queue and assembles the movies from the checkpointed results.
+        An unfinished crawl (its process died mid-way) is resumed instead of starting over.
+        """
+        crawl_id, resumed = self.job_queue.open_crawl(self._list_urls())
+        logger.info("Queue crawl started", extra={"crawl": crawl_id, "resumed": resumed})
+        self.run_queue_workers(crawl_id)
+        
+        lists = self.job_queue.results(crawl_id, "list")
+        details = self.job_queue.results(crawl_id, "detail")
+        counts = self.job_queue.counts(crawl_id)
+        self.job_queue.finish_crawl(crawl_id)
+        logger.info("Queue crawl finished", extra={"crawl": crawl_id, "jobs": counts})
+        
+        if lists.get(self.base_url) is None:
+            raise ScraperError("Failed to fetch movie list in the job queue.")
+        movies = self._merge_movie_lists([lists[url] for url in self._list_urls() if lists.get(url) is not None])
+        for movie in movies:
+            movie.update(details.get(movie['link']) or {})
+        return movies
+
+    def _crawl_all_enriched_movies(self) -> List[dict]:
+        
+        if self.crawl_engine == "reparse":
+            return self._reparse_archive()
+        
+        if self.crawl_engine == "queue":
+            try:
+                return self._crawl_queue()
+            except ScraperError as e:
+                return self._import_csv_fallback(e)
+        
+        if self.crawl_engine == "async":
+            return asyncio.run(self._acrawl_all_enriched_movies())
         
         try:
             movies = self._crawl_movie_list()
-        except ScraperError:
-            if os.path.exists(self.exporter.csv_path):
-                print("Using existing CSV database due to scraping error.")
-                return self.exporter.import_movies_csv()
-            else:
-                raise
+        except ScraperError as e:
+            return self._import_csv_fallback(e)
+        
+        if self.crawl_engine == "process":
+            return self.pipeline.run(movies)
             
-        with ThreadPoolExecutor(max_workers=os.cpu_count() * 2) as executor:
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             futures = [executor.submit(self._crawl_movie_details, movie['link']) for movie in movies]
             details_list = [f.result() for f in futures]
 
         for i, movie in enumerate(movies):
             movie.update(details_list[i])
         return movies
+
+    async def _acrawl_movie_list(self, engine: AsyncCrawlEngine) -> List[dict]:
+        async def fetch(url) -> List[dict]:
+            response = await engine.fetch_response(url)
+            response.raise_for_status()
+            if self.archive is not None:
+                await asyncio.to_thread(self._archive_page, url, response.content)
+            return self._parse_movie_list(response.text)
+        
+        urls = self._list_urls()
+        results = await asyncio.gather(*(fetch(url) for url in urls), return_exceptions=True)
+        if isinstance(results[0], httpx.HTTPError):
+            raise ScraperError(f"Failed to fetch movie list: {str(results[0])}")
+        
+        lists = []
+        for url, result in zip(urls, results):
+            if isinstance(result, (httpx.HTTPError, NotFoundError, CircuitOpenError)) and url != self.base_url:
+                logger.warning("Skipping additional movie list", extra={"link": url, "error": str(result)})
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                lists.append(result)
+        return self._merge_movie_lists(lists)
+
+    async def _acrawl_movie_details(self, engine: AsyncCrawlEngine, url) -> dict:
+        
+        try:
+            response = await engine.fetch_response(url, self._conditional_headers(url))
+            if response.status_code != 304:
+                response.raise_for_status()
+            
+        except (httpx.HTTPError, CircuitOpenError):
+            self.page_cache.fail()
+            return {}
+        
+        if response.status_code == 200 and self.archive is not None:
+            await asyncio.to_thread(self._archive_page, url, response.content)
+        if (details := self.page_cache.resolve(url, response.status_code, response.headers, response.content)) is not None:
+            return details
+        
+        details = self._parse_movie_details(response.text)
+        self.page_cache.remember(url, details)
+        return details
+
+    async def _acrawl_all_enriched_movies(self, live: Optional[LiveCrawl] = None) -> List[dict]:
+        """Crawls with AsyncCrawlEngine; with `live`, each movie is published as soon as its details are in."""
+        async with AsyncCrawlEngine(per_host_limit=self.per_host_limit, header=self.header, policy=self.fetch_policy) as engine:
+            try:
+                movies = await self._acrawl_movie_list(engine)
+            except ScraperError as e:
+                movies = self._import_csv_fallback(e)
+                if live is not None:
+                    live.start(movies)
+                    for i, movie in enumerate(movies):
+                        live.publish(i, movie)
+                return movies
+            
+            if live is not None:
+                live.start(movies)
+
+            async def enrich(i):
+                movies[i].update(await self._acrawl_movie_details(engine, movies[i]['link']))
+                if live is not None:
+                    live.publish(i, movies[i])
+
+            await asyncio.gather(*(enrich(i) for i in range(len(movies))))
+        return movies
+
+    def _load_snapshot(self, crawl: Optional[Callable[[], List[dict]]] = None) -> MovieCatalog:
+        if not self.page_cache.entries:
+            try:
+                self.page_cache.entries = self.store.load_pages()
+            except sqlite3.Error as e:
+                logger.warning("Failed to load page validators from SQLite", extra={"error": str(e)})
+        
+        self.page_cache.begin()
+        movies = crawl() if crawl is not None else self._crawl_all_enriched_movies()
+        logger.info("Refresh summary", extra={"pages": self.page_cache.finish(), "fetch_policy": self.fetch_policy.stats()})
+        
+        try:
+            # An empty crawl must not wipe the database the fallback relies on
+            if movies:
+                self.store.replace_movies(movies)
+            self.store.save_pages(self.page_cache.entries)
+        except sqlite3.Error as e:
+            logger.warning("Failed to save movies to SQLite", extra={"error": str(e)})
+        
+        # The snapshot holds the compact catalog, the crawled dicts are dropped here;
+        # its indexes are built off the request path and attached to it before it is swapped in
+        catalog = MovieCatalog(movies)
+        logger.info("Catalog built", extra=catalog.stats())
+        self._get_movie_index(catalog)
+        self._get_query_index(catalog)
+        try:
+            catalog.dump(self.snapshot_path)
+        except OSError as e:
+            logger.warning("Failed to persist snapshot", extra={"error": str(e)})
+        # The export endpoints serve these files, so every snapshot refreshes them
+        try:
+            written = self.exporter.export_movies(catalog)
+            logger.info("Exports written", extra={"exports": written})
+        except Exception as e:
+            logger.warning("Failed to write exports", extra={"error": str(e)})
+        return catalog
+
+    def warm_start(self) -> bool:
+        """
+        Restores the last persisted snapshot and builds its indexes, so requests are served
+        from it right away. It keeps its real age, so a scheduled refresh is due on time.
+        Returns False when there is no usable snapshot on disk.
+        """
+        start = time.perf_counter()
+        try:
+            catalog, meta = MovieCatalog.load(self.snapshot_path)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable persisted snapshot", extra={"error": str(e)})
+            return False
+        loaded = time.perf_counter()
+        
+        self._get_movie_index(catalog)
+        self._get_query_index(catalog)
+        age = max(0.0, time.time() - meta.get("saved_at", 0))
+        self.snapshot.set(catalog, age=age)
+        logger.info("Restored persisted snapshot", extra={
+            "movies": len(catalog), "age_s": round(age), "load_s": round(loaded - start, 4),
+            "index_s": round(time.perf_counter() - loaded, 4),
+        })
+        return True
+
+    def _load_list_snapshot(self) -> MovieCatalog:
+        try:
+            movies = self._crawl_movie_list()
+        except ScraperError as e:
+            movies = self._import_csv_fallback(e)
+        catalog = MovieCatalog(movies)
+        self._get_movie_index(catalog, "list")
+        return catalog
+
+    def _get_all_enriched_movies(self) -> Sequence[dict]:
+        """
+        Returns the cached enriched movie snapshot, crawling only on a cold start.
+        The snapshot is a MovieCatalog shared between requests; each movie read from it
+        is a fresh dict.
+        """
+        return self.snapshot.get()
+
+    async def _aget_all_enriched_movies(self) -> Sequence[dict]:
+        return await self.snapshot.aget()
+
+    def _get_index(self, movies, kind: str, build):
+        """
+        Returns the `kind` index of `movies`, building it once. A snapshot catalog carries its
+        own indexes, so requests still holding the previous snapshot during a swap keep using
+        its indexes instead of rebuilding them; other lists keep the last index of each kind.
+        """
+        indexes = movies.indexes if isinstance(movies, MovieCatalog) else self._indexes
+        index = indexes.get(kind)
+        if index is None or index.movies is not movies:
+            index = indexes[kind] = build(movies)
+        return index
+
+    def _get_movie_index(self, movies, kind="enriched") -> MovieIndex:
+        """Returns the search index for `movies`."""
+        return self._get_index(movies, kind, MovieIndex)
+
+    def _get_query_index(self, movies) -> QueryIndex:
+        """Returns the sorted field indexes and facet counts for `movies`."""
+        return self._get_index(movies, "query", QueryIndex)
+
+    def invalidate_snapshot(self, drop: bool = False) -> None:
+        """Forces the next read to refresh the enriched movie snapshot."""
+        self.snapshot.invalidate(drop=drop)
     
     # ==================================================================
     # Public API-like Methods
@@ -177,96 +649,231 @@ class MovieService:
         if not movies:
             movies = self._get_all_enriched_movies()
             
-        genres = set()
-        for m in movies:
-            if m.get('genre'):
-                for g in m['genre'].split(','):
-                    norm_g = g.strip().lower()
-                    if norm_g:
-                        genres.add(norm_g)
-        return GenreListResponse(genres=sorted(genres))
+        return GenreListResponse(genres=self._get_movie_index(movies).all_genres())
 
     def update_movie_database(self) -> UpdateMoviesResponse:
-        """[ENDPOINT] Fetches all movie data and saves it to the CSV file."""
-        print("Updating database...")
+        """[ENDPOINT] Fetches all movie data and exports it (CSV, NDJSON and, with pyarrow, Parquet)."""
+        logger.info("Updating database")
 
-        enriched_movies = self._get_all_enriched_movies()
+        enriched_movies = self.snapshot.reload()
         if not enriched_movies:
             raise NotFoundError("No movies found to update.")
 
-        # Print top 3 movies for verification
-        print("\n--- Top 3 Movies ---")
-        for i, movie in enumerate(enriched_movies[:3]):
-            print(f"\n========== Movie #{i+1} ==========")
-            for key, value in movie.items():
-                print(f"  - {key}: {value}")
-        print("===============================\n")
+        # Log top 3 movies for verification
+        for movie in enriched_movies[:3]:
+            logger.debug("Top movie", extra={"movie": movie})
         
         # Convert Dict to MovieDetails model
-        movies_adapter = TypeAdapter(List[MovieDetails])
-        validated_movies = movies_adapter.validate_python(enriched_movies)
-
-        headers = [
-            'index', 'rating', 'title', 'genre', 'year', 'description', 'link', 
-            'poster_img', 'cover_img', 'release_date', 'tomato_score', 
-            'tomato_reviews', 'audience_score', 'audience_ratings', 'cast_crew'
-        ]
-        try:
-            os.makedirs(self.exporter.csv_folder, exist_ok=True)
-            with open(self.exporter.csv_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=headers, extrasaction='ignore')
-                writer.writeheader()
-                for movie in enriched_movies:
-                    if 'cast_crew' in movie and isinstance(movie['cast_crew'], list):
-                        movie['cast_crew'] = json.dumps(movie['cast_crew'])
-                    writer.writerow(movie)
-        
-            print(f"Database update complete. Saved {len(enriched_movies)} movies.")
-            
-        except Exception as e:
-            raise ScraperError(f"An error occurred during database update: {str(e)}")
+        with timed("validate"):
+            validated_movies = self.movies_adapter.validate_python(enriched_movies)
+
+        # The reload has written the exports; each format is streamed to a temporary file and renamed into place
+        logger.info("Database update complete", extra={"movies": len(enriched_movies)})
         
         return UpdateMoviesResponse(movies=validated_movies)
 
-    def search_movies_live(self, name=None, genre=[]) -> SearchMoviesResponse:
+    def search_movies_live(self, name=None, genre=[], movies=None, q=None) -> SearchMoviesResponse:
         
-        print("Performing live search... this may take a moment.")
-        movies = self._get_all_enriched_movies()
+        if movies is None:
+            movies = self._get_all_enriched_movies()
         
-        if name:
-            pattern = re.compile(re.escape(name), re.IGNORECASE)
-            movies = [m for m in movies if pattern.search(m.get('title', '').lower())]
-
-        if genre:
-            for g in genre:
-                g = g.lower().strip()
-                movies = [m for m in movies if re.search(f"{re.escape(g)}", m.get('genre', '').lower())]
+        # Title grams and genre postings are intersected, genres match whole names only
+        movies = self._get_movie_index(movies).search(name=name, genre=genre)
+        
+        # Full-text words over title and description are answered by the SQLite FTS5 index
+        if q:
+            links = self.store.search_links(q=q)
+            movies = [m for m in movies if m['link'] in links]
 
         if not movies:
             raise NotFoundError("No movies matched your search criteria.")
         
         # Convert Dict to MovieDetails model
-        movies_adapter = TypeAdapter(List[MovieDetails])
-        validated_movies = movies_adapter.validate_python(movies)
+        with timed("validate"):
+            validated_movies = self.movies_adapter.validate_python(movies)
 
-        print("Live search complete!")
+        logger.debug("Search complete", extra={"movie_name": name, "genre": genre, "q": q, "count": len(movies)})
         
         return SearchMoviesResponse(count=len(movies), movies=validated_movies)
 
-    def get_movie_details(self, name=None):
+    def query_movies(self, ranges=None, genre=[], sort="index", offset=0, limit=20, fields=None, facets=True,
+                     movies=None) -> MovieQueryResponse:
+        """
+        Filters movies by inclusive numeric ranges ({field: (low, high)}) and genres and returns
+        one page sorted by a numeric field ("-field" for descending), with only `fields` of each
+        movie and the genre and decade counts of every match.
+        """
+        if movies is None:
+            movies = self._get_all_enriched_movies()
         
-        print("Movie name:", name) # Debugging line
+        index = self._get_query_index(movies)
+        total, page, counts = index.query(ranges, genre, sort.lstrip("-"), sort.startswith("-"), offset, limit, facets)
         
+        with timed("validate"):
+            include = set(fields) if fields else None
+            rows = [self.movie_adapter.validate_python(movies[i]).model_dump(mode="json", include=include) for i in page]
+        
+        return MovieQueryResponse(count=total, offset=offset, limit=limit, movies=rows, facets=counts)
+
+    def _find_movie(self, movies, name, year=None, kind="enriched") -> dict:
         if name is None or len(name) == 0:
-            return NotFoundError("No movies matched your search criteria.")
+            raise NotFoundError("No movies matched your search criteria.")
         
-        movies = self._crawl_movie_list()
+        # "Title (1999)" works like passing the year separately
+        if year is None and (year_match := re.fullmatch(r"(.+?)\s*\((\d{4})\)", name.strip())):
+            name, year = year_match.group(1), int(year_match.group(2))
         
+        # Titles match exactly after normalization (case, punctuation, accents)
+        movie = self._get_movie_index(movies, kind).lookup(name, year)
+        if movie is None:
+            raise NotFoundError("No movies matched your search criteria.")
+        return movie
+
+    # ==================================================================
+    # Async Methods (awaited directly by the routes)
+    # ==================================================================
+
+    async def asearch_movies_cached(self, name=None, genre=[], q=None) -> Tuple[str, bytes]:
+        """
+        Returns (ETag, JSON body) of a search response. Bodies are cached per snapshot
+        version and normalized query, so repeated queries skip validation and serialization;
+        a miss (and the SQLite full-text lookup in it) is built in a worker thread.
+        """
+        version, movies = await self.snapshot.aget_versioned()
+        key = (
+            "search", version,
+            normalize_text(name) if name else "",
+            tuple(sorted({g.strip().lower() for g in genre})),
+            tuple(re.findall(r"\w+", q.lower())) if q else None,
+        )
+        def build() -> bytes:
+            response = self.search_movies_live(name=name, genre=genre, movies=movies, q=q)
+            with timed("serialize"):
+                return response.model_dump_json().encode()
+
+        return await self.responses.aget_or_build(key, build)
+
+    async def aquery_movies_cached(self, ranges=None, genre=[], sort="index", offset=0, limit=20, fields=None,
+                                   facets=True) -> Tuple[str, bytes]:
+        """Returns (ETag, JSON body) of a query response, cached per snapshot version like searches."""
+        version, movies = await self.snapshot.aget_versioned()
+        key = (
+            "query", version,
+            tuple(sorted((field, bounds) for field, bounds in (ranges or {}).items() if bounds != (None, None))),
+            tuple(sorted({g.strip().lower() for g in genre})),
+            sort, offset, limit,
+            tuple(sorted(set(fields))) if fields else None,
+            facets,
+        )
+        def build() -> bytes:
+            response = self.query_movies(ranges, genre, sort, offset, limit, fields, facets, movies=movies)
+            with timed("serialize"):
+                return response.model_dump_json().encode()
+
+        return await self.responses.aget_or_build(key, build)
+
+    async def aget_all_genres_cached(self) -> Tuple[str, bytes]:
+        version, movies = await self.snapshot.aget_versioned()
+        def build() -> bytes:
+            response = self.get_all_genres(movies)
+            with timed("serialize"):
+                return response.model_dump_json().encode()
+
+        return await self.responses.aget_or_build(("genres", version), build)
+
+    async def astream_movies(self, name=None, genre=[], q=None, order="completion") -> AsyncIterator[MovieDetails]:
+        """
+        Returns an iterator over matching movies, each validated as soon as it is available.
+        A warm snapshot is streamed straight from memory; on a cold start the movies are
+        crawled live and emitted as their detail pages complete, either in completion
+        order or (order="rank") in rank order as soon as every earlier rank is done.
+        Concurrent cold streams share that one crawl, which is installed as the snapshot.
+        The list page is fetched before returning, so its errors surface before streaming.
+        """
+        links = await asyncio.to_thread(self.store.search_links, q=q) if q else None
+
+        def accept(movie) -> Optional[MovieDetails]:
+            if not movie_matches(movie, name, genre) or (links is not None and movie['link'] not in links):
+                return None
+            try:
+                with timed("validate"):
+                    return MovieDetails.model_validate(movie)
+            except ValidationError as e:
+                logger.warning("Skipping movie that fails validation in stream", extra={"link": movie.get("link"), "errors": e.error_count()})
+                return None
+
+        if self.snapshot.has_value:
+            return self._astream_list(self._get_all_enriched_movies(), accept)
+
+        # Cold start: concurrent streams share one crawl, which then becomes the snapshot
+        live = self._live_crawl or self._start_live_crawl()
+        await live.started()
+        if live.movies is None:
+            if live.error is not None:
+                raise live.error
+            # A load that was not streamed got there first
+            return self._astream_list(live.snapshot, accept)
+        return self._astream_live(live, accept, order)
+
+    def _start_live_crawl(self) -> LiveCrawl:
+        """
+        Starts the cold-start crawl that streams subscribe to. It runs as the snapshot load,
+        under crawl_flight: a load already in flight is joined instead, and loads arriving
+        meanwhile join this one. It is not tied to a request, so a client leaving does not stop it.
+        """
+        live = self._live_crawl = LiveCrawl()
+        loop = asyncio.get_running_loop()
+
+        def crawl() -> List[dict]:
+            # Called in the flight's thread; the crawl itself runs on the event loop
+            return asyncio.run_coroutine_threadsafe(self._acrawl_all_enriched_movies(live), loop).result()
+
+        def finished(task: asyncio.Future) -> None:
+            self._live_crawl = None
+            if task.cancelled():
+                live.finish(error=ScraperError("The movie crawl was cancelled."))
+            elif (error := task.exception()) is not None:
+                live.finish(error=error)
+            else:
+                live.finish(task.result())
+
+        live.task = asyncio.ensure_future(asyncio.to_thread(self.snapshot.fill, lambda: self._load_snapshot(crawl)))
+        live.task.add_done_callback(finished)
+        return live
+
+    async def _astream_list(self, movies, accept) -> AsyncIterator[MovieDetails]:
         for movie in movies:
-            if re.match(rf'^{name}$', movie["title"], re.IGNORECASE):
-                result = self._crawl_movie_details(movie['link'])
-                movies_adapter = TypeAdapter(MovieDetails)
-                movie.update(result)
-                return movies_adapter.validate_python(movie)
+            if (validated := accept(movie)) is not None:
+                yield validated
+
+    async def _astream_live(self, live: LiveCrawl, accept, order) -> AsyncIterator[MovieDetails]:
+        done, next_rank = {}, 0
+        async for i, movie in live.subscribe():
+            if order != "rank":
+                if (validated := accept(movie)) is not None:
+                    yield validated
+                continue
+            # Rank order: hold results back until every earlier rank has arrived
+            done[i] = movie
+            while next_rank in done:
+                if (validated := accept(done.pop(next_rank))) is not None:
+                    yield validated
+                next_rank += 1
 
-        return NotFoundError("No movies matched your search criteria.")
\ No newline at end of file
+    async def aget_movie_details(self, name=None, year=None) -> MovieDetails:
+        
+        logger.debug("Movie lookup", extra={"movie_name": name, "year": year})
+        
+        # A warm enriched snapshot already holds every detail page
+        if self.snapshot.has_value:
+            movie = self._find_movie(await self._aget_all_enriched_movies(), name, year)
+            return self.movie_adapter.validate_python(movie)
+        
+        movie = self._find_movie(await self.list_snapshot.aget(), name, year, kind="list")
+        if (result := self.details_cache.get(movie['link'])) is None:
+            async with AsyncCrawlEngine(per_host_limit=self.per_host_limit, header=self.header, policy=self.fetch_policy) as engine:
+                result = await self._acrawl_movie_details(engine, movie['link'])
+            if result:
+                self.details_cache.set(movie['link'], result)
+        
+        return self.movie_adapter.validate_python({**movie, **result})
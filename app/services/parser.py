@@ -0,0 +1,167 @@
+import re
+from typing import Optional, Tuple
+
+
+class DetailPageParser:
+    """
+    Extracts every MovieDetails field from a detail page without whole-document regex scans.
+    Each field is located with `str.find` on its literal anchor, and regexes only ever
+    run inside the small slice that follows it, never across the whole document.
+    Output is identical to the `page2_pattern` regex parser in MovieService.
+    """
+
+    def __init__(self):
+        self.patterns = {
+            "og_image": re.compile(r'property=["\']og:image["\']'),
+            "content": re.compile(r'content=["\'](.*?)["\']', re.S),
+            "iconic": re.compile(r'fallbacktheme=["\']iconic["\']'),
+            "src": re.compile(r'src=["\'](.*?)[,"\']', re.S),
+            "release": re.compile(r'"metadataProps":.*?"Released ([A-Z][a-z]{1,4} \d{1,2}, \d{4})","(.*?)"]', re.S),
+            "section_end": re.compile(r'\s*?</section>'),
+            "tags": re.compile(r'<.*?>'),
+            "digits": re.compile(r'\D'),
+            "score": {
+                "tomato_score": re.compile(r'<rt-text.*?slot="criticsScore".*?(\d{1,3})%.*?</rt-text>', re.S),
+                "tomato_reviews": re.compile(r'<rt-link.*?slot="criticsReviews".*?>(.*?)</rt-link>', re.S),
+                "audience_score": re.compile(r'<rt-text.*?slot="audienceScore".*?(\d{1,3})%.*?</rt-text>', re.S),
+                "audience_ratings": re.compile(r'<rt-link.*?slot="audienceReviews".*?>(.*?)</rt-link>', re.S),
+            },
+            "cast_crew": {
+                "img": re.compile(r'<rt-img.*?src="(.*?)".*?>\s*?</rt-img>', re.S),
+                "name": re.compile(r'<p class="name" data-qa="person-name">(.*?)</p>', re.S),
+                "role": re.compile(r'<p class="role" data-qa="person-role">(.*?)</p>', re.S),
+            },
+        }
+
+    # ==================================================================
+    # Anchor Helpers
+    # ==================================================================
+
+    @staticmethod
+    def _between(html, start, open_tag, close_tag) -> Optional[Tuple[int, int]]:
+        """Returns the (start, end) of the text between `open_tag` and the next `close_tag`."""
+        i = html.find(open_tag, start)
+        if i < 0:
+            return None
+        i += len(open_tag)
+        j = html.find(close_tag, i)
+        if j < 0:
+            return None
+        return i, j
+
+    # ==================================================================
+    # Field Extractors
+    # ==================================================================
+
+    def _poster_img(self, html) -> Optional[str]:
+        i = html.find("<meta")
+        if i < 0 or not (prop := self.patterns["og_image"].search(html, i)):
+            return None
+        if (content := self.patterns["content"].search(html, prop.end())):
+            return content.group(1).strip()
+        return None
+
+    def _cover_img(self, html) -> Optional[str]:
+        i = html.find("<rt-img")
+        if i < 0 or not (theme := self.patterns["iconic"].search(html, i)):
+            return None
+        # The tag still has to be closed somewhere after the src value
+        if (src := self.patterns["src"].search(html, theme.end())) and html.find(">", src.end()) >= 0:
+            return src.group(1).strip()
+        return None
+
+    def _description(self, html) -> Optional[str]:
+        i = html.find('<div slot="description"')
+        if i < 0:
+            return None
+        if not (span := self._between(html, i + 23, ' <rt-text slot="content" size="1">', "</rt-text>")):
+            return None
+        return self.patterns["tags"].sub('', html[span[0]:span[1]].strip())
+
+    def _genre(self, html) -> Optional[str]:
+        if not (span := self._between(html, 0, '"metadataGenres":[', "]")):
+            return None
+        return html[span[0]:span[1]].replace('"', '').replace(', ', ',').lower()
+
+    def _release_date(self, html) -> Optional[str]:
+        span = self._between(html, 0, '<script id="media-hero-json" data-json="mediaHero" type="application/json">', "</script>")
+        if not span:
+            return None
+        i = html.find('"metadataProps":', span[0], span[1])
+        if i < 0:
+            return None
+        # Matching against the slice keeps `.*?` inside the script body, like the regex parser
+        if (release := self.patterns["release"].match(html[i:span[1]])):
+            return release.group(1).strip()
+        return None
+
+    def _scores(self, html, details) -> None:
+        i = html.find("<media-scorecard")
+        if i < 0 or not (span := self._between(html, i, ">", "</media-scorecard>")):
+            return
+        score_card = html[span[0]:span[1]]
+        patterns = self.patterns["score"]
+        if (t_score := patterns["tomato_score"].search(score_card)):
+            details["tomato_score"] = int(t_score.group(1))
+        if (t_count := patterns["tomato_reviews"].search(score_card)):
+            details["tomato_reviews"] = int(self.patterns["digits"].sub('', t_count.group(1)))
+        if (p_score := patterns["audience_score"].search(score_card)):
+            details["audience_score"] = int(p_score.group(1))
+        if (p_count := patterns["audience_ratings"].search(score_card)):
+            details["audience_ratings"] = int(self.patterns["digits"].sub('', p_count.group(1).replace(',', '')))
+
+    def _cast_crew(self, html) -> Optional[list]:
+        i = html.find("<section")
+        if i < 0:
+            return None
+        i = html.find('aria-labelledby="cast-and-crew-label"', i)
+        if i < 0:
+            return None
+        i = html.find('<div class="content-wrap">', i)
+        if i < 0:
+            return None
+        start = end = i + 26
+
+        # The content ends at the first </div> that is followed only by whitespace and </section>
+        while True:
+            end = html.find("</div>", end)
+            if end < 0:
+                return None
+            if self.patterns["section_end"].match(html, end + 6):
+                break
+            end += 6
+
+        content = html[start:end]
+        patterns = self.patterns["cast_crew"]
+        names = patterns["name"].findall(content)
+        roles = patterns["role"].findall(content)
+        imgs = patterns["img"].findall(content)
+        return [
+            {"name": names[i].strip(), "role": roles[i].strip() if i < len(roles) else "", "img": imgs[i].strip() if i < len(imgs) else ""}
+            for i in range(len(names))
+        ]
+
+    # ==================================================================
+    # Public
+    # ==================================================================
+
+    def parse(self, html) -> dict:
+        details = {}
+
+        if (poster_img := self._poster_img(html)) is not None:
+            details["poster_img"] = poster_img
+        if (description := self._description(html)) is not None:
+            details["description"] = description
+        if (genre := self._genre(html)) is not None:
+            details["genre"] = genre
+        if (release_date := self._release_date(html)) is not None:
+            details["release_date"] = release_date
+        if (cover_img := self._cover_img(html)) is not None:
+            details["cover_img"] = cover_img
+
+        self._scores(html, details)
+
+        if (cast_crew := self._cast_crew(html)) is not None:
+            details["cast_crew"] = cast_crew
+
+        return details
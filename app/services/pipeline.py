@@ -0,0 +1,213 @@
+import os
+import time
+import logging
+import multiprocessing
+import queue
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pydantic import ValidationError
+from app.schemas.crawler import MovieDetails
+from app.services.parser import DetailPageParser
+from app.services.archive import read_blob
+from app.services.metrics import record_parse, record_timing
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+_parser = DetailPageParser()
+
+
+def parse_detail_page(html: str) -> Tuple[dict, float]:
+    """Process pool entry point; returns the details and the time spent parsing them."""
+    start = time.perf_counter()
+    details = _parser.parse(html)
+    return details, time.perf_counter() - start
+
+
+def parse_archived_page(path: str) -> Tuple[dict, float]:
+    """Process pool entry point for re-parsing a page from the PageArchive."""
+    return parse_detail_page(read_blob(path).decode("utf-8", errors="replace"))
+
+
+class StageStats:
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy = 0.0
+        self.first_start: Optional[float] = None
+        self.last_end: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, start: float, end: float, busy: Optional[float] = None) -> None:
+        with self._lock:
+            self.items += 1
+            self.busy += end - start if busy is None else busy
+            self.first_start = start if self.first_start is None else min(self.first_start, start)
+            self.last_end = end if self.last_end is None else max(self.last_end, end)
+
+    def report(self) -> dict:
+        wall = (self.last_end - self.first_start) if self.items else 0.0
+        return {
+            "workers": self.workers,
+            "items": self.items,
+            "busy_s": round(self.busy, 4),
+            "wall_s": round(wall, 4),
+            "items_per_s": round(self.items / wall, 1) if wall else None,
+            # Share of the stage's worker capacity spent working; the bottleneck sits near 1.0
+            "utilization": round(self.busy / (wall * self.workers), 3) if wall else None,
+        }
+
+
+class CrawlPipeline:
+    """
+    fetch -> parse -> validate pipeline for detail pages, with bounded queues between stages.
+    Fetching stays concurrent I/O in threads, parsing fans out to a process pool sized to
+    the cores, and validation runs in a single thread that merges details into each movie.
+    """
+
+    def __init__(self, fetch: Callable[[str], Tuple[Optional[str], Optional[dict]]], fetch_workers: int = None,
+                 parse_workers: int = None, queue_size: int = 32, remember: Callable[[str, dict], None] = None):
+        # `fetch` returns (html to parse, None) or (None, details reused from an unchanged page);
+        # `remember` is called with every freshly parsed page
+        self.fetch = fetch
+        self.remember = remember
+        self.fetch_workers = fetch_workers or os.cpu_count() * 2
+        self.parse_workers = parse_workers or os.cpu_count()
+        self.queue_size = queue_size
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self.last_report: Dict[str, dict] = {}
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        # Started lazily and reused across crawls, worker start-up is paid once
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn, not fork: the service process is multi-threaded
+                self._pool = ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def _reset_pool(self, pool: ProcessPoolExecutor, error: BaseException) -> None:
+        """Drops a broken pool (e.g. a worker was OOM-killed), so the next page starts a fresh one."""
+        with self._pool_lock:
+            if self._pool is not pool:
+                return  # already replaced by another page that hit the same breakage
+            self._pool = None
+        logger.warning("Parse pool broken, parsing its pages inline and starting a new pool", extra={"error": str(error)})
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    # ==================================================================
+    # Stages
+    # ==================================================================
+
+    def _fetch_stage(self, movies, parse_queue, stats: StageStats) -> None:
+        def fetch_one(i):
+            start = time.perf_counter()
+            html, reused = self.fetch(movies[i]["link"])
+            stats.record(start, time.perf_counter())
+            parse_queue.put((i, html, reused))  # blocks while the parse stage is behind
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.fetch_workers) as executor:
+                list(executor.map(fetch_one, range(len(movies))))
+        finally:
+            parse_queue.put(_DONE)
+
+    def _parse_stage(self, movies, parse_queue, validate_queue, stats: StageStats) -> None:
+        # Bounds the pages handed to the pool so fetched HTML cannot pile up in memory
+        slots = threading.BoundedSemaphore(self.queue_size)
+        pending = []
+
+        def on_parsed(i, start, html, pool, future):
+            try:
+                try:
+                    details, busy = future.result()
+                except BrokenProcessPool as e:
+                    self._reset_pool(pool, e)
+                    details, busy = parse_detail_page(html)
+                record_parse(details, busy)
+                if self.remember:
+                    self.remember(movies[i]["link"], details)
+            except Exception as e:
+                logger.warning("Failed to parse detail page", extra={"link": movies[i]["link"], "error": str(e)})
+                details, busy = {}, None
+            # Busy time is measured in the worker so pool queueing is not counted as parsing
+            stats.record(start, time.perf_counter(), busy)
+            slots.release()
+            validate_queue.put((i, details))
+
+        try:
+            while (item := parse_queue.get()) is not _DONE:
+                i, html, reused = item
+                if html is None:
+                    validate_queue.put((i, reused or {}))
+                    continue
+                slots.acquire()
+                start = time.perf_counter()
+                pool = self.pool
+                try:
+                    future = pool.submit(parse_detail_page, html)
+                except Exception as e:
+                    # A broken pool must not stall the fetch stage: this page is parsed here, the next gets a fresh pool
+                    self._reset_pool(pool, e)
+                    future = Future()
+                    future.set_result(parse_detail_page(html))
+                future.add_done_callback(lambda f, i=i, start=start, html=html, pool=pool: on_parsed(i, start, html, pool, f))
+                pending.append(future)
+
+            for future in pending:
+                future.exception()  # wait, errors are handled in on_parsed
+        finally:
+            validate_queue.put(_DONE)
+
+    def _validate_stage(self, movies, validate_queue, stats: StageStats) -> None:
+        while (item := validate_queue.get()) is not _DONE:
+            i, details = item
+            start = time.perf_counter()
+            enriched = {**movies[i], **details}
+            try:
+                MovieDetails.model_validate(enriched)
+                movies[i] = enriched
+            except ValidationError as e:
+                # Keep the list-page fields rather than serving a movie that fails the schema
+                logger.warning("Dropping details that fail validation", extra={"link": movies[i]["link"], "errors": e.error_count()})
+            stats.record(start, end := time.perf_counter())
+            record_timing("validate", end - start)
+
+    # ==================================================================
+    # Public
+    # ==================================================================
+
+    def run(self, movies: List[dict]) -> List[dict]:
+        """Enriches `movies` (in place, in rank order) with their detail pages and returns them."""
+        parse_queue = queue.Queue(maxsize=self.queue_size)
+        validate_queue = queue.Queue(maxsize=self.queue_size)
+        stats = {
+            "fetch": StageStats("fetch", self.fetch_workers),
+            "parse": StageStats("parse", self.parse_workers),
+            "validate": StageStats("validate", 1),
+        }
+
+        stages = [
+            threading.Thread(target=self._fetch_stage, args=(movies, parse_queue, stats["fetch"]), daemon=True),
+            threading.Thread(target=self._parse_stage, args=(movies, parse_queue, validate_queue, stats["parse"]), daemon=True),
+        ]
+        for stage in stages:
+            stage.start()
+        self._validate_stage(movies, validate_queue, stats["validate"])
+        for stage in stages:
+            stage.join()
+
+        self.last_report = {name: stage.report() for name, stage in stats.items()}
+        logger.info("Crawl pipeline stages", extra={"stages": self.last_report})
+        return movies
@@ -0,0 +1,263 @@
+import time
+import random
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+from urllib.parse import urlsplit
+from app.schemas.exceptions import CircuitOpenError
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+
+
+def retry_after_seconds(value: Optional[str], limit: float = 60) -> Optional[float]:
+    """Parses a Retry-After header (delta-seconds or HTTP-date), capped at `limit`."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), limit)
+
+
+class TokenBucket:
+    """
+    Token bucket whose rate adapts to the upstream (AIMD): halved on a throttling response
+    (at most once per second, since requests already in flight get throttled together),
+    raised by a small step on every success, between `min_rate` and `max_rate`.
+    Callers reserve a slot under the lock and sleep outside it, so the bucket works
+    for threads and coroutines alike.
+    """
+
+    def __init__(self, max_rate: float = 20, burst: int = 20, min_rate: float = 0.5):
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.rate = max_rate
+        self.burst = burst
+
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._throttled_at = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes one token and returns how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now)
+
+    def throttle(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._throttled_at >= 1:
+                self._throttled_at = now
+                self.rate = max(self.min_rate, self.rate / 2)
+                self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+
+    def recover(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 50)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout` seconds, then lets a single probe through (half-open):
+    its success closes the circuit again, its failure reopens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self._opened_at >= self.reset_timeout else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def release(self) -> None:
+        """Frees the half-open probe slot without an outcome (the probe was cancelled)."""
+        with self._lock:
+            self._probing = False
+
+
+class FetchPolicy:
+    """
+    Per-host rate limiting, retries and circuit breaking around one HTTP call.
+    `send` performs a single attempt and returns a response with `status_code` and
+    `headers` (requests and httpx both fit); `errors` are the transport exceptions
+    worth retrying. Throttling responses (429/503) slow the host's TokenBucket down
+    and honour Retry-After; retries back off exponentially with full jitter.
+    Raises CircuitOpenError while the host's circuit is open.
+    """
+
+    def __init__(
+        self,
+        rate: float = 20,
+        burst: int = 20,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.counts = {"attempts": 0, "retries": 0, "throttled": 0, "rejected": 0}
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url: str) -> Tuple[TokenBucket, CircuitBreaker]:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+                self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self._buckets[host], self._breakers[host]
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] += 1
+
+    def _before(self, url: str) -> float:
+        """Checks the circuit and returns the rate limit wait for the next attempt."""
+        bucket, breaker = self._host(url)
+        if not breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError(f"Circuit open for {urlsplit(url).netloc}, not fetching {url}")
+        self._count("attempts")
+        return bucket.reserve()
+
+    def _after(self, url: str, attempt: int, response: Any = None, error: Optional[BaseException] = None) -> Optional[float]:
+        """Records an attempt's outcome. Returns the delay before retrying, or None when done."""
+        bucket, breaker = self._host(url)
+        status = getattr(response, "status_code", None)
+        retry_after = None
+
+        if error is None and status not in RETRY_STATUSES:
+            bucket.recover()
+            breaker.record_success()
+            return None
+
+        if status in THROTTLE_STATUSES:
+            self._count("throttled")
+            retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+            bucket.throttle(retry_after)
+        if status != 429:
+            # 429 is the host asking us to slow down, not a sign that it is unhealthy
+            breaker.record_failure()
+
+        if attempt >= self.max_retries:
+            return None
+        self._count("retries")
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    def _abort(self, url: str, error: BaseException) -> None:
+        """
+        Records an attempt that raised outside `errors`: a failure, or, when it was cancelled,
+        no outcome. Either way a half-open probe slot is released, or the circuit never closes.
+        """
+        breaker = self._host(url)[1]
+        if isinstance(error, Exception):
+            breaker.record_failure()
+        else:
+            breaker.release()
+
+    def call(self, url: str, send: Callable[[], Any], errors: Tuple[Type[BaseException], ...] = ()) -> Any:
+        """Runs `send` under the policy and returns the last response, or raises its last error."""
+        for attempt in range(self.max_retries + 1):
+            if (wait := self._before(url)) > 0:
+                time.sleep(wait)
+            try:
+                response, error = send(), None
+            except errors as e:
+                response, error = None, e
+            except BaseException as e:
+                self._abort(url, e)
+                raise
+
+            delay = self._after(url, attempt, response, error)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+            time.sleep(delay)
+
+    async def acall(self, url: str, send: Callable[[], Awaitable[Any]], errors: Tuple[Type[BaseException], ...] = ()) -> Any:
+        """Async variant of call(); waits with asyncio.sleep."""
+        for attempt in range(self.max_retries + 1):
+            if (wait := self._before(url)) > 0:
+                await asyncio.sleep(wait)
+            try:
+                response, error = await send(), None
+            except errors as e:
+                response, error = None, e
+            except BaseException as e:
+                self._abort(url, e)
+                raise
+
+            delay = self._after(url, attempt, response, error)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self.counts,
+                "hosts": {
+                    host: {"rate": round(bucket.rate, 2), "circuit": self._breakers[host].state}
+                    for host, bucket in self._buckets.items()
+                },
+            }
@@ -0,0 +1,144 @@
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from app.services.catalog import MISSING, MovieCatalog
+
+NUMERIC_FIELDS = ('index', 'rating', 'year', 'tomato_score', 'tomato_reviews', 'audience_score', 'audience_ratings')
+
+
+class QueryIndex:
+    """
+    Sorted per-field indexes and facet counts over one snapshot, built once and then read-only.
+    For every numeric field, `order` lists the positions by ascending value (ties in rank
+    order, movies without a value last) next to `keys`, the sorted values themselves, so
+    a range filter is two bisects to a slice that is already in that field's sort order.
+    `rank` maps a position back to its place in `order`, to sort filtered subsets.
+    """
+
+    def __init__(self, movies: Sequence[dict]):
+        self.movies = movies
+        self.catalog = movies if isinstance(movies, MovieCatalog) else MovieCatalog(movies)
+        self.keys: Dict[str, array] = {}
+        self.order: Dict[Tuple[str, bool], array] = {}
+        self.rank: Dict[Tuple[str, bool], array] = {}
+
+        positions = range(len(self.catalog))
+        for field in NUMERIC_FIELDS:
+            column = self.catalog.column(field)
+            present = sorted((i for i in positions if column[i] != MISSING), key=column.__getitem__)
+            missing = [i for i in positions if column[i] == MISSING]
+            self.keys[field] = array(column.typecode, (column[i] for i in present))
+            # Sorting is stable, so ties keep rank order in both directions
+            descending = sorted(present, key=column.__getitem__, reverse=True)
+            for reverse, order in ((False, present), (True, descending)):
+                self.order[field, reverse] = array('i', order + missing)
+                rank = array('i', bytes(4 * len(order + missing)))
+                for place, i in enumerate(self.order[field, reverse]):
+                    rank[i] = place
+                self.rank[field, reverse] = rank
+
+        self.genre_positions: Dict[str, array] = {
+            genre: array('i', (i for i in positions if self._has_genres(i, 1 << gid)))
+            for gid, genre in enumerate(self.catalog.genres)
+        }
+        # Genre set bitmasks by genre_ref, with a trailing 0 for movies without genres (ref -1)
+        self.set_masks = self.catalog.genre_set_masks + [0]
+        self.facets = self.count_facets(positions)
+
+    def _has_genres(self, i: int, mask: int) -> bool:
+        ref = self.catalog.genre_ref[i]
+        return ref >= 0 and self.catalog.genre_set_masks[ref] & mask == mask
+
+    def _range(self, field: str, low: Optional[float], high: Optional[float]) -> Tuple[int, int]:
+        """Slice of order[field, False] holding the values within [low, high]."""
+        keys = self.keys[field]
+        start = bisect_left(keys, low) if low is not None else 0
+        end = bisect_right(keys, high) if high is not None else len(keys)
+        return start, max(start, end)
+
+    def count_facets(self, positions: Iterable[int]) -> Dict[str, Dict[str, int]]:
+        """Genre and decade counts over the given positions."""
+        catalog = self.catalog
+        positions = list(positions)
+        genres = Counter()
+        for ref, count in Counter(catalog.genre_ref[i] for i in positions).items():
+            if ref >= 0:
+                for gid in catalog.genre_set_members[ref]:
+                    genres[catalog.genres[gid]] += count
+        years = catalog.column('year')
+        decades = Counter(f"{years[i] // 10 * 10}s" for i in positions if years[i] != MISSING)
+        return {
+            "genre": dict(sorted(genres.items())),
+            "decade": dict(sorted(decades.items())),
+        }
+
+    def query(
+        self,
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+        genre: Optional[List[str]] = None,
+        sort: str = "index",
+        descending: bool = False,
+        offset: int = 0,
+        limit: int = 20,
+        facets: bool = True,
+    ) -> Tuple[int, List[int], Optional[Dict[str, Dict[str, int]]]]:
+        """
+        Returns (total matches, positions of the requested page, facet counts of all matches).
+        `ranges` maps numeric fields to inclusive (low, high) bounds, either may be None.
+        """
+        ranges = {field: bounds for field, bounds in (ranges or {}).items() if bounds != (None, None)}
+        order = self.order[sort, descending]
+
+        if not ranges and not genre:
+            return len(order), list(order[offset:offset + limit]), self.facets if facets else None
+
+        slices = {field: self._range(field, *bounds) for field, bounds in ranges.items()}
+        if not genre and ranges.keys() == {sort}:
+            # Only the sort field is filtered: the page is a slice of its own index
+            start, end = slices[sort]
+            if descending:
+                present = len(self.keys[sort])
+                start, end = present - end, present - start
+            page = order[min(start + offset, end):min(start + offset + limit, end)]
+            return end - start, list(page), self.count_facets(order[start:end]) if facets else None
+
+        # The smallest candidate set drives the scan, the other filters are checked per movie
+        candidates = [(end - start, field) for field, (start, end) in slices.items()]
+        mask = 0
+        if genre:
+            mask = self.catalog.genre_mask(genre)
+            if mask is None:
+                return 0, [], self.count_facets([]) if facets else None
+            candidates.extend((len(self.genre_positions[self.catalog.genres[gid]]), gid)
+                              for gid in range(len(self.catalog.genres)) if mask >> gid & 1)
+        _, driver = min(candidates, key=lambda candidate: candidate[0])
+
+        if isinstance(driver, str):
+            start, end = slices[driver]
+            scan = self.order[driver, False][start:end]
+        else:
+            scan = self.genre_positions[self.catalog.genres[driver]]
+
+        matches = list(scan)
+        for field, (low, high) in ranges.items():
+            if field == driver:
+                continue
+            column = self.catalog.column(field)
+            # MISSING sorts below any bound, only an upper bound alone has to exclude it
+            if low is None:
+                matches = [i for i in matches if MISSING != column[i] <= high]
+            elif high is None:
+                matches = [i for i in matches if column[i] >= low]
+            else:
+                matches = [i for i in matches if low <= column[i] <= high]
+        if mask:
+            refs, masks = self.catalog.genre_ref, self.set_masks
+            matches = [i for i in matches if masks[refs[i]] & mask == mask]
+
+        if driver == sort and not descending:
+            page = matches[offset:offset + limit]
+        else:
+            page = heapq.nsmallest(offset + limit, matches, key=self.rank[sort, descending].__getitem__)[offset:]
+        return len(matches), page, self.count_facets(matches) if facets else None
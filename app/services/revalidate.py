@@ -0,0 +1,91 @@
+import hashlib
+import threading
+from typing import Dict, Optional
+from app.services.metrics import record_cache
+
+
+class PageEntry:
+    __slots__ = ("etag", "last_modified", "content_hash", "details")
+
+    def __init__(self, etag=None, last_modified=None, content_hash=None, details=None):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+        self.details = details
+
+
+class PageCache:
+    """
+    Validators and parsed details of every detail page, keyed by `link`.
+    Lets a re-crawl send conditional requests and skip parsing when a page is
+    unchanged (304, or 200 with the same content hash), reusing the last details.
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, PageEntry] = {}
+        self.counts: Dict[str, int] = {}
+        self.last_summary: Dict[str, int] = {}
+        self._pending: Dict[str, PageEntry] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, key: str) -> None:
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def begin(self) -> None:
+        with self._lock:
+            self.counts = {"fetched": 0, "not_modified": 0, "unchanged": 0, "changed": 0, "failed": 0}
+
+    def finish(self) -> Dict[str, int]:
+        with self._lock:
+            self.last_summary = dict(self.counts)
+            self._pending.clear()
+            return self.last_summary
+
+    def conditional_headers(self, link: str) -> dict:
+        entry = self.entries.get(link)
+        if entry is None or entry.details is None:
+            return {}
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def resolve(self, link: str, status: int, headers, body: Optional[bytes]) -> Optional[dict]:
+        """
+        Records a fetch result. Returns the previous details when the page is unchanged,
+        or None when the body has to be parsed (then call `remember` with the result).
+        """
+        with self._lock:
+            self._count("fetched")
+            entry = self.entries.get(link)
+
+            if status == 304 and entry is not None and entry.details is not None:
+                self._count("not_modified")
+                record_cache("pages", True)
+                return entry.details
+
+            content_hash = hashlib.blake2b(body or b"", digest_size=16).hexdigest()
+            if entry is not None and entry.details is not None and entry.content_hash == content_hash:
+                self._count("unchanged")
+                record_cache("pages", True)
+                # Keep any new validators so the next crawl can get a 304
+                entry.etag = headers.get("ETag") or entry.etag
+                entry.last_modified = headers.get("Last-Modified") or entry.last_modified
+                return entry.details
+
+            record_cache("pages", False)
+            self._pending[link] = PageEntry(headers.get("ETag"), headers.get("Last-Modified"), content_hash)
+            return None
+
+    def remember(self, link: str, details: dict) -> None:
+        with self._lock:
+            self._count("changed")
+            entry = self._pending.pop(link, None) or PageEntry()
+            entry.details = details
+            self.entries[link] = entry
+
+    def fail(self) -> None:
+        with self._lock:
+            self._count("failed")
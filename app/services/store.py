@@ -0,0 +1,275 @@
+import os
+import re
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set
+from app.services.index import split_genres
+from app.services.revalidate import PageEntry
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS movies (
+    id INTEGER PRIMARY KEY,
+    link TEXT NOT NULL UNIQUE,
+    "index" INTEGER,
+    rating REAL,
+    title TEXT NOT NULL,
+    year INTEGER,
+    description TEXT,
+    poster_img TEXT,
+    cover_img TEXT,
+    release_date TEXT,
+    tomato_score INTEGER,
+    tomato_reviews INTEGER,
+    audience_score INTEGER,
+    audience_ratings INTEGER,
+    cast_count INTEGER
+);
+CREATE INDEX IF NOT EXISTS movies_index ON movies("index");
+
+CREATE TABLE IF NOT EXISTS genres (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS movie_genres (
+    movie_id INTEGER NOT NULL REFERENCES movies(id) ON DELETE CASCADE,
+    genre_id INTEGER NOT NULL REFERENCES genres(id),
+    position INTEGER NOT NULL,
+    PRIMARY KEY (movie_id, genre_id)
+);
+CREATE INDEX IF NOT EXISTS movie_genres_genre ON movie_genres(genre_id, movie_id);
+
+CREATE TABLE IF NOT EXISTS people (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    img TEXT NOT NULL DEFAULT '',
+    UNIQUE (name, img)
+);
+CREATE TABLE IF NOT EXISTS movie_cast (
+    movie_id INTEGER NOT NULL REFERENCES movies(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    person_id INTEGER NOT NULL REFERENCES people(id),
+    role TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (movie_id, position)
+);
+
+CREATE TABLE IF NOT EXISTS pages (
+    link TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT,
+    details TEXT NOT NULL
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS movies_fts USING fts5(
+    title, description, content='movies', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS movies_fts_insert AFTER INSERT ON movies BEGIN
+    INSERT INTO movies_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS movies_fts_delete AFTER DELETE ON movies BEGIN
+    INSERT INTO movies_fts(movies_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS movies_fts_update AFTER UPDATE ON movies BEGIN
+    INSERT INTO movies_fts(movies_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    INSERT INTO movies_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+"""
+
+COLUMNS = [
+    'link', 'index', 'rating', 'title', 'year', 'description', 'poster_img', 'cover_img',
+    'release_date', 'tomato_score', 'tomato_reviews', 'audience_score', 'audience_ratings',
+]
+
+
+class MovieStore:
+    """
+    SQLite database of enriched movies; the canonical copy of the crawl on disk.
+    Movies are keyed by `link`, with normalized genre and cast tables and an FTS5
+    index over title and description. CSV is only written as an export.
+    """
+
+    def __init__(self, db_folder="app/export", db_filename="movies.db"):
+        self.db_folder = db_folder
+        self.db_path = os.path.join(db_folder, db_filename)
+        self._write_lock = threading.Lock()
+        self._ready = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        if not self._ready:
+            os.makedirs(self.db_folder, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA foreign_keys = ON")
+            if not self._ready:
+                # WAL lets readers keep going while a crawl is being written
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.executescript(SCHEMA)
+                self._ready = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ==================================================================
+    # Writes
+    # ==================================================================
+
+    def _ids(self, conn: sqlite3.Connection, table: str, columns: List[str], keys: Set[tuple]) -> Dict[tuple, int]:
+        """Maps each key tuple to its row id, scanning the table once for large batches."""
+        if len(keys) > 256:
+            return {tuple(row[1:]): row[0] for row in conn.execute(f"SELECT id, {', '.join(columns)} FROM {table}")}
+        where = " AND ".join(f"{column} = ?" for column in columns)
+        return {key: conn.execute(f"SELECT id FROM {table} WHERE {where}", key).fetchone()[0] for key in keys}
+
+    def _upsert(self, conn: sqlite3.Connection, movies: List[dict]) -> None:
+        # cast_count stays NULL when the detail page had no cast section, so [] and None round-trip
+        columns = COLUMNS + ["cast_count"]
+        quoted = ", ".join(f'"{c}"' for c in columns)
+        updates = ", ".join(f'"{c}" = excluded."{c}"' for c in columns[1:])
+        conn.executemany(
+            f'INSERT INTO movies ({quoted}) VALUES ({", ".join("?" * len(columns))}) ON CONFLICT(link) DO UPDATE SET {updates}',
+            (
+                [movie.get(column) for column in COLUMNS] + [None if movie.get("cast_crew") is None else len(movie["cast_crew"])]
+                for movie in movies
+            ),
+        )
+        movie_ids = self._ids(conn, "movies", ["link"], {(movie["link"],) for movie in movies})
+
+        genres = {movie["link"]: list(dict.fromkeys(split_genres(movie.get("genre")))) for movie in movies}
+        genre_names = {(name,) for names in genres.values() for name in names}
+        conn.executemany("INSERT OR IGNORE INTO genres (name) VALUES (?)", genre_names)
+        genre_ids = self._ids(conn, "genres", ["name"], genre_names)
+
+        people = {(p.get("name") or "", p.get("img") or "") for movie in movies for p in movie.get("cast_crew") or []}
+        conn.executemany("INSERT OR IGNORE INTO people (name, img) VALUES (?, ?)", people)
+        person_ids = self._ids(conn, "people", ["name", "img"], people)
+
+        ids = [(movie_ids[(movie["link"],)],) for movie in movies]
+        conn.executemany("DELETE FROM movie_genres WHERE movie_id = ?", ids)
+        conn.executemany("DELETE FROM movie_cast WHERE movie_id = ?", ids)
+        conn.executemany(
+            "INSERT INTO movie_genres (movie_id, genre_id, position) VALUES (?, ?, ?)",
+            (
+                (movie_ids[(link,)], genre_ids[(name,)], position)
+                for link, names in genres.items() for position, name in enumerate(names)
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO movie_cast (movie_id, position, person_id, role) VALUES (?, ?, ?, ?)",
+            (
+                (movie_ids[(movie["link"],)], position, person_ids[(p.get("name") or "", p.get("img") or "")], p.get("role") or "")
+                for movie in movies for position, p in enumerate(movie.get("cast_crew") or [])
+            ),
+        )
+
+    def upsert_movie(self, movie: dict) -> None:
+        """Inserts or replaces a single movie (matched on `link`)."""
+        self.upsert_movies([movie])
+
+    def upsert_movies(self, movies: List[dict]) -> None:
+        """Inserts or replaces every movie in one transaction."""
+        with self._write_lock, self._connect() as conn:
+            self._upsert(conn, movies)
+
+    def replace_movies(self, movies: List[dict]) -> None:
+        """
+        Stores one full crawl in one transaction: its movies are upserted and every movie
+        that is no longer in it is deleted (with its genre and cast rows), so ranks stay unique.
+        """
+        with self._write_lock, self._connect() as conn:
+            self._upsert(conn, movies)
+            conn.execute("CREATE TEMP TABLE crawled (link TEXT PRIMARY KEY)")
+            conn.executemany("INSERT OR IGNORE INTO crawled (link) VALUES (?)", ((movie["link"],) for movie in movies))
+            conn.execute("DELETE FROM movies WHERE link NOT IN (SELECT link FROM crawled)")
+            conn.execute("DROP TABLE crawled")
+
+    def save_pages(self, entries: Dict[str, PageEntry]) -> None:
+        """Persists detail page validators and parsed details for conditional re-crawls."""
+        with self._write_lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO pages (link, etag, last_modified, content_hash, details) VALUES (?, ?, ?, ?, ?)",
+                (
+                    (link, e.etag, e.last_modified, e.content_hash, json.dumps(e.details))
+                    for link, e in entries.items() if e.details is not None
+                ),
+            )
+
+    # ==================================================================
+    # Reads
+    # ==================================================================
+
+    def load_pages(self) -> Dict[str, PageEntry]:
+        with self._connect() as conn:
+            return {
+                link: PageEntry(etag, last_modified, content_hash, json.loads(details))
+                for link, etag, last_modified, content_hash, details in conn.execute("SELECT * FROM pages")
+            }
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM movies").fetchone()[0]
+
+    def _filters(self, name=None, genre=None, q=None):
+        clauses, params = [], []
+        if name:
+            clauses.append("m.title LIKE ? ESCAPE '\\'")
+            params.append("%" + re.sub(r"([%_\\])", r"\\\1", name) + "%")
+        for g in genre or []:
+            clauses.append("m.id IN (SELECT mg.movie_id FROM movie_genres mg JOIN genres g ON g.id = mg.genre_id WHERE g.name = ?)")
+            params.append(g.strip().lower())
+        if q is not None:
+            # Every word must match as a prefix, quoted so FTS5 syntax in user input is inert
+            terms = [f'"{word}"*' for word in re.findall(r"\w+", q)]
+            clauses.append("m.id IN (SELECT rowid FROM movies_fts WHERE movies_fts MATCH ?)" if terms else "0")
+            params.extend([" AND ".join(terms)] if terms else [])
+        return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def _load(self, conn: sqlite3.Connection, where="", params=()) -> List[dict]:
+        quoted = ", ".join(f'm."{c}"' for c in COLUMNS)
+        rows = conn.execute(f'SELECT m.id, m.cast_count, {quoted} FROM movies m {where} ORDER BY m."index", m.id', params).fetchall()
+        # Detail rows are limited to the selected movies; "{}" is the joined table's alias
+        ids = f"WHERE {{}}.movie_id IN (SELECT m.id FROM movies m {where})" if where else ""
+
+        genres: Dict[int, List[str]] = {}
+        for row in conn.execute(
+            f"SELECT mg.movie_id, g.name FROM movie_genres mg JOIN genres g ON g.id = mg.genre_id "
+            f"{ids.format('mg')} ORDER BY mg.movie_id, mg.position", params
+        ):
+            genres.setdefault(row[0], []).append(row[1])
+        cast: Dict[int, List[dict]] = {}
+        for row in conn.execute(
+            f"SELECT mc.movie_id, p.name, mc.role, p.img FROM movie_cast mc JOIN people p ON p.id = mc.person_id "
+            f"{ids.format('mc')} ORDER BY mc.movie_id, mc.position", params
+        ):
+            cast.setdefault(row[0], []).append({"name": row[1], "role": row[2], "img": row[3]})
+
+        movies = []
+        for movie_id, cast_count, *values in rows:
+            # Leave out empty detail columns so the dicts match what the crawler produces
+            movie = {key: value for key, value in zip(COLUMNS, values) if value is not None}
+            if movie_id in genres:
+                movie["genre"] = ",".join(genres[movie_id])
+            if cast_count is not None:
+                movie["cast_crew"] = cast.get(movie_id, [])
+            movies.append(movie)
+        return movies
+
+    def load_movies(self) -> List[dict]:
+        """Returns every movie as a crawler-shaped dict, in rank order."""
+        with self._connect() as conn:
+            return self._load(conn)
+
+    def search_links(self, name: Optional[str] = None, genre: Optional[List[str]] = None, q: Optional[str] = None) -> Set[str]:
+        """Links of movies matching a title substring, whole genre names and full-text words."""
+        where, params = self._filters(name, genre, q)
+        with self._connect() as conn:
+            return {link for (link,) in conn.execute(f"SELECT m.link FROM movies m {where}", params)}
+
+    def search(self, name: Optional[str] = None, genre: Optional[List[str]] = None, q: Optional[str] = None) -> List[dict]:
+        """Same filters as search_links, returning the movies in rank order."""
+        where, params = self._filters(name, genre, q)
+        with self._connect() as conn:
+            return self._load(conn, where, params)
@@ -0,0 +1,58 @@
+"""
+Standalone crawl worker for the "queue" crawl engine.
+
+    python -m app.worker [--threads 16] [--wait] [--poll 1.0]
+
+Joins the unfinished crawl in the shared job queue (app/export/jobs.db) and claims its
+list and detail jobs next to the API process, so more processes, or nodes sharing the
+volume, finish a crawl sooner. Reads the same MOVIES_* environment variables as the API.
+Without --wait it exits once the crawl has no pending or leased jobs left (or none is
+running); with --wait it keeps polling for new crawls.
+"""
+import time
+import logging
+import argparse
+import sqlite3
+from app.services.logs import configure_logging
+from app.services.movie import MovieService
+
+logger = logging.getLogger("app.worker")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=None, help="concurrent jobs (default: 2 per CPU)")
+    parser.add_argument("--wait", action="store_true", help="keep waiting for new crawls")
+    parser.add_argument("--poll", type=float, default=1.0, help="seconds between checks for a crawl to join")
+    args = parser.parse_args()
+
+    configure_logging()
+    service = MovieService.from_env()
+    # Validators of known pages, so unchanged detail pages are answered by a 304
+    try:
+        service.page_cache.entries = service.store.load_pages()
+    except sqlite3.Error as e:
+        logger.warning("Failed to load page validators from SQLite", extra={"error": str(e)})
+
+    try:
+        while True:
+            if (crawl_id := service.job_queue.current_crawl()) is not None:
+                ran = service.run_queue_workers(crawl_id, args.threads)
+                if ran:
+                    logger.info("Worked on crawl", extra={"crawl": crawl_id, "jobs": ran})
+                # Every job is done or failed; the crawl stays open until the API assembles it,
+                # which may never happen if it died, so only --wait keeps polling
+                counts = service.job_queue.counts(crawl_id)
+                if not args.wait and not counts["pending"] and not counts["leased"]:
+                    break
+            elif not args.wait:
+                break
+            time.sleep(args.poll)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.pipeline.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Parser microbenchmark: regex detail parser vs DetailPageParser over saved detail pages.
+
+    python -m benchmarks.parse_details [pages.html ...] [--repeat 50]
+
+Without arguments every benchmarks/fixtures/detail_*.html page is used. Each page is
+first checked for identical output from both parsers, then timed per page.
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+from app.services.movie import MovieService
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def time_per_page(parse, html, repeat) -> float:
+    """Returns the best-of-`repeat` parse time in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(html)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pages", nargs="*", help="saved detail pages (default: fixtures/detail_*.html)")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    paths = args.pages or sorted(glob.glob(os.path.join(FIXTURES_DIR, "detail_*.html")))
+    if not paths:
+        sys.exit("No detail pages to benchmark.")
+
+    service = MovieService()
+    print(f"{'page':<32} {'KiB':>7} {'regex ms':>10} {'single ms':>10} {'speedup':>8}")
+
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+
+        if service._parse_movie_details(html) != service._parse_movie_details_regex(html):
+            sys.exit(f"{path}: DetailPageParser output differs from the regex parser")
+
+        regex_ms = time_per_page(service._parse_movie_details_regex, html, args.repeat)
+        single_ms = time_per_page(service._parse_movie_details, html, args.repeat)
+        print(f"{os.path.basename(path):<32} {len(html) / 1024:>7.1f} {regex_ms:>10.3f} {single_ms:>10.3f} {regex_ms / single_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Records the live list page and a sample of detail pages as benchmark fixtures.
+
+    python -m benchmarks.record [--details 20] [--out benchmarks/fixtures]
+
+The list page is saved as list_recorded.html and each detail page as detail_<slug>.html,
+which the replay server then serves in place of the synthetic samples.
+"""
+import os
+import argparse
+from urllib.parse import urlsplit
+from app.services.movie import MovieService
+from benchmarks.replay import FIXTURES_DIR
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--details", type=int, default=20, help="number of detail pages to record, spread over the ranking")
+    parser.add_argument("--out", default=FIXTURES_DIR)
+    args = parser.parse_args()
+
+    service = MovieService()
+    os.makedirs(args.out, exist_ok=True)
+
+    html = service._fetch_page(service.base_url)
+    with open(os.path.join(args.out, "list_recorded.html"), "w", encoding="utf-8") as f:
+        f.write(html)
+    movies = service._parse_movie_list(html)
+    print(f"Recorded list page with {len(movies)} movies")
+
+    step = max(len(movies) // max(args.details, 1), 1)
+    for movie in movies[::step][:args.details]:
+        slug = urlsplit(movie["link"]).path.rstrip("/").rsplit("/", 1)[-1]
+        with open(os.path.join(args.out, f"detail_{slug}.html"), "w", encoding="utf-8") as f:
+            f.write(service._fetch_page(movie["link"]))
+        print(f"Recorded {movie['link']}")
+
+
+if __name__ == "__main__":
+    main()
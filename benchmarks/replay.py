@@ -0,0 +1,209 @@
+"""
+Local HTTP server replaying recorded pages, so crawls can be benchmarked offline.
+
+    python -m benchmarks.replay [--port 8765] [--latency 0.05] [--error-rate 0.02]
+
+The list page (fixtures/list_recorded.html if one was recorded, else list_sample.html)
+is served at the same path as MovieService.base_url, with its rottentomatoes.com links
+rewritten to point back at the server. /m/<slug> gets fixtures/detail_<slug>.html when
+it was recorded, otherwise one of the detail pages picked by slug (so a movie always
+gets the same page). Latency, jitter and the share of 503 responses are configurable, and
+pages carry ETags so conditional re-crawls can be replayed too. The server also counts
+connections and peak concurrent requests and keeps each request's headers, for the tests.
+"""
+import os
+import glob
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+LIST_PATH = "/guide/best-movies-of-all-time/"
+UPSTREAM = "https://www.rottentomatoes.com"
+
+
+class ReplayServer:
+    """
+    Replays `list_page` and `detail_pages` on 127.0.0.1 from a background thread.
+    Use as a context manager; `base_url` is the list page URL to crawl.
+    `fault` is called with each request path and may return (status, headers) to answer
+    with instead of the page, e.g. to script a sequence of 429s.
+    """
+
+    def __init__(
+        self,
+        list_page: Optional[str] = None,
+        detail_pages: Optional[List[str]] = None,
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        etag: bool = True,
+        seed: int = 0,
+        fault: Optional[Callable[[str], Optional[Tuple[int, Dict[str, str]]]]] = None,
+    ):
+        recorded = os.path.join(FIXTURES_DIR, "list_recorded.html")
+        self.list_page = list_page or (recorded if os.path.exists(recorded) else os.path.join(FIXTURES_DIR, "list_sample.html"))
+        self.detail_pages = detail_pages or sorted(glob.glob(os.path.join(FIXTURES_DIR, "detail_*.html")))
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.etag = etag
+        self.fault = fault
+        self.counts: Dict[str, int] = {
+            "requests": 0, "errors": 0, "not_modified": 0, "bytes": 0,
+            "connections": 0, "in_flight": 0, "max_in_flight": 0,
+        }
+        self.request_headers: List[Dict[str, str]] = []
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._details: List[bytes] = []
+        self._by_slug: Dict[str, bytes] = {}
+        self._list = b""
+
+    @property
+    def origin(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    @property
+    def base_url(self) -> str:
+        return self.origin + LIST_PATH
+
+    def start(self) -> "ReplayServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), self._handler())
+        self._server.daemon_threads = True
+        with open(self.list_page, "rb") as f:
+            self._list = f.read().replace(UPSTREAM.encode(), self.origin.encode())
+        self._details, self._by_slug = [], {}
+        for path in self.detail_pages:
+            with open(path, "rb") as f:
+                self._details.append(f.read())
+            self._by_slug[os.path.basename(path)[len("detail_"):-len(".html")]] = self._details[-1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counts[key] += amount
+
+    def _enter(self, headers: Dict[str, str]) -> None:
+        with self._lock:
+            self.counts["requests"] += 1
+            self.counts["in_flight"] += 1
+            self.counts["max_in_flight"] = max(self.counts["max_in_flight"], self.counts["in_flight"])
+            self.request_headers.append(headers)
+
+    def _body(self, path: str) -> Optional[bytes]:
+        if path == LIST_PATH:
+            return self._list
+        if path.startswith("/m/") and self._details:
+            slug = path[len("/m/"):].strip("/")
+            if slug in self._by_slug:
+                return self._by_slug[slug]
+            return self._details[int(hashlib.md5(slug.encode()).hexdigest(), 16) % len(self._details)]
+        return None
+
+    def _delay_and_fail(self) -> bool:
+        with self._lock:
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0)
+            fail = self._rng.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        return fail
+
+    def _handler(self):
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes; with Nagle on, keep-alive responses stall ~40ms
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                replay._count("connections")
+
+            def do_GET(self):
+                replay._enter({key.lower(): value for key, value in self.headers.items()})
+                try:
+                    self._respond(urlsplit(self.path).path)
+                finally:
+                    replay._count("in_flight", -1)
+
+            def _respond(self, path):
+                body = replay._body(path)
+                if replay._delay_and_fail():
+                    replay._count("errors")
+                    return self._send(503, b"", {"Retry-After": "1"})
+                if replay.fault is not None and (fault := replay.fault(path)) is not None:
+                    replay._count("errors")
+                    return self._send(fault[0], b"", fault[1])
+                if body is None:
+                    return self._send(404, b"")
+
+                headers = {"Content-Type": "text/html; charset=utf-8"}
+                if replay.etag:
+                    headers["ETag"] = '"' + hashlib.md5(body).hexdigest() + '"'
+                    if self.headers.get("If-None-Match") == headers["ETag"]:
+                        replay._count("not_modified")
+                        return self._send(304, b"", headers)
+                replay._count("bytes", len(body))
+                self._send(200, body, headers)
+
+            def _send(self, status, body, headers=None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)) if status != 304 else "0")
+                self.end_headers()
+                if status != 304:
+                    self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--no-etag", action="store_true")
+    args = parser.parse_args()
+
+    server = ReplayServer(port=args.port, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, etag=not args.no_etag)
+    with server:
+        print(f"Replaying {len(server.detail_pages)} detail pages, list at {server.base_url}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
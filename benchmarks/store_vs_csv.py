@@ -0,0 +1,99 @@
+"""
+Load and query time of the SQLite MovieStore against the CSV round-trip.
+
+    python -m benchmarks.store_vs_csv [--sizes 1000 10000 100000]
+
+For each size a synthetic catalog is written both ways into a temporary folder, then
+reloaded and searched (title substring + genre) with each backend.
+"""
+import re
+import csv
+import json
+import time
+import random
+import argparse
+import tempfile
+from app.services.export import ExportService
+from app.services.store import MovieStore
+
+GENRES = ["drama", "comedy", "action", "sci-fi", "horror", "romance", "mystery & thriller", "melodrama"]
+WORDS = ["night", "river", "king", "last", "city", "dream", "shadow", "summer", "war", "love", "ghost", "road"]
+HEADERS = [
+    'index', 'rating', 'title', 'genre', 'year', 'description', 'link',
+    'poster_img', 'cover_img', 'release_date', 'tomato_score',
+    'tomato_reviews', 'audience_score', 'audience_ratings', 'cast_crew'
+]
+
+
+def make_movies(size, seed=0):
+    rng = random.Random(seed)
+    people = [f"Person {i}" for i in range(max(size // 2, 10))]
+    return [
+        {
+            "index": i + 1,
+            "rating": rng.randint(60, 100),
+            "title": " ".join(rng.sample(WORDS, 3)).title() + f" {i}",
+            "link": f"https://www.rottentomatoes.com/m/movie_{i}",
+            "year": rng.randint(1920, 2024),
+            "genre": ",".join(rng.sample(GENRES, rng.randint(1, 3))),
+            "description": " ".join(rng.choices(WORDS, k=30)),
+            "poster_img": f"https://resizing.flixster.com/poster_{i}.jpg",
+            "tomato_score": rng.randint(0, 100),
+            "tomato_reviews": rng.randint(10, 500),
+            "audience_score": rng.randint(0, 100),
+            "audience_ratings": rng.randint(1000, 250000),
+            "cast_crew": [
+                {"name": name, "role": "Actor", "img": f"https://resizing.flixster.com/{name.replace(' ', '_')}.jpg"}
+                for name in rng.sample(people, 8)
+            ],
+        }
+        for i in range(size)
+    ]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def write_csv(path, movies):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=HEADERS, extrasaction='ignore')
+        writer.writeheader()
+        for movie in movies:
+            writer.writerow({**movie, 'cast_crew': json.dumps(movie['cast_crew'])})
+
+
+def search_csv(exporter, name, genre):
+    # The pre-SQLite search path: reload the file, then filter linearly
+    movies = exporter.import_movies_csv()
+    pattern = re.compile(re.escape(name), re.IGNORECASE)
+    return [m for m in movies if pattern.search(m['title']) and genre in m['genre'].split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'backend':<8} {'write ms':>10} {'load ms':>10} {'search ms':>10} {'hits':>6}")
+    for size in args.sizes:
+        movies = make_movies(size)
+        with tempfile.TemporaryDirectory() as folder:
+            exporter = ExportService(csv_folder=folder)
+            store = MovieStore(db_folder=folder)
+
+            _, write_ms = timed(lambda: write_csv(exporter.csv_path, movies))
+            _, load_ms = timed(exporter.import_movies_csv)
+            hits, search_ms = timed(lambda: search_csv(exporter, "king", "drama"))
+            print(f"{size:>8} {'csv':<8} {write_ms:>10.1f} {load_ms:>10.1f} {search_ms:>10.1f} {len(hits):>6}")
+
+            _, write_ms = timed(lambda: store.upsert_movies(movies))
+            _, load_ms = timed(store.load_movies)
+            hits, search_ms = timed(lambda: store.search(name="king", genre=["drama"]))
+            print(f"{size:>8} {'sqlite':<8} {write_ms:>10.1f} {load_ms:>10.1f} {search_ms:>10.1f} {len(hits):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Offline benchmark suite for the crawl, parse and search paths.
+
+    python -m benchmarks.suite [--scenarios crawl parse search memory catalog startup] [--output results.json]
+                               [--compare baseline.json] [--latency 0.02] [--error-rate 0.0]
+
+Crawls run against benchmarks.replay.ReplayServer, so nothing leaves the machine.
+Scenarios:
+    crawl   cold and conditional re-crawl time of _get_all_enriched_movies, per engine
+    parse   DetailPageParser ns/page over the detail fixtures
+    search  search, cached response and exact lookup latency over a synthetic catalog
+    memory  tracemalloc peak and retained size of a cold crawl
+    catalog MovieCatalog size and build time against the list of movie dicts
+    startup warm start from a persisted snapshot (load, index build, first request)
+
+Results are printed and, with --output, written as JSON (commit, environment and one
+flat dict of metrics per scenario). --compare prints each metric next to a previous
+result file so runs from different commits can be diffed.
+"""
+import os
+import sys
+import glob
+import json
+import time
+import asyncio
+import logging
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+from datetime import datetime, timezone
+from app.schemas.exceptions import NotFoundError
+from app.services.catalog import MovieCatalog, deep_sizeof
+from app.services.export import ExportService
+from app.services.jobs import JobQueue
+from app.services.movie import MovieService
+from app.services.parser import DetailPageParser
+from app.services.store import MovieStore
+from benchmarks.replay import FIXTURES_DIR, ReplayServer
+from benchmarks.store_vs_csv import make_movies
+
+SEARCHES = [("king", []), ("the", ["drama"]), ("", ["comedy", "action"]), ("night river", []), ("zzz", [])]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def make_service(server, folder, engine="thread", rate_limit=1000) -> MovieService:
+    service = MovieService(crawl_engine=engine, rate_limit=rate_limit)
+    service.base_url = server.base_url
+    service.store = MovieStore(db_folder=folder)
+    service.exporter = ExportService(csv_folder=folder)
+    service.job_queue = JobQueue(db_folder=folder)
+    service.snapshot_path = os.path.join(folder, "snapshot.bin")
+    return service
+
+
+def replay_server(args) -> ReplayServer:
+    return ReplayServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+
+
+# ==================================================================
+# Scenarios
+# ==================================================================
+
+def bench_crawl(args) -> dict:
+    results = {}
+    for engine in args.engines:
+        with replay_server(args) as server, tempfile.TemporaryDirectory() as folder:
+            service = make_service(server, folder, engine, args.rate_limit)
+            try:
+                start = time.perf_counter()
+                movies = service._get_all_enriched_movies()
+                cold = time.perf_counter() - start
+
+                start = time.perf_counter()
+                service.snapshot.reload()
+                recrawl = time.perf_counter() - start
+            finally:
+                service.pipeline.shutdown()
+
+            results.update({
+                f"{engine}_cold_s": round(cold, 4),
+                f"{engine}_movies_per_s": round(len(movies) / cold, 1),
+                f"{engine}_recrawl_s": round(recrawl, 4),
+                f"{engine}_with_details": sum("description" in movie for movie in movies),
+                f"{engine}_requests": server.counts["requests"],
+            })
+    return results
+
+
+def bench_parse(args) -> dict:
+    parser = DetailPageParser()
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "detail_*.html"))):
+        with open(path, encoding="utf-8") as f:
+            pages.append(f.read())
+    if not pages:
+        return {}
+
+    per_page = []
+    for html in pages:
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter_ns()
+            parser.parse(html)
+            samples.append(time.perf_counter_ns() - start)
+        per_page.append(statistics.median(samples))
+
+    total_bytes = sum(len(html.encode()) for html in pages)
+    return {
+        "pages": len(pages),
+        "ns_per_page": int(statistics.mean(per_page)),
+        "mb_per_s": round(total_bytes / (sum(per_page) / 1e9) / 1e6, 1),
+    }
+
+
+def bench_search(args) -> dict:
+    with tempfile.TemporaryDirectory() as folder, replay_server(args) as server:
+        service = make_service(server, folder)
+        movies = make_movies(args.catalog)
+        start = time.perf_counter()
+        service._get_movie_index(movies)
+        index_s = time.perf_counter() - start
+        service.snapshot.set(movies)
+
+        def search(name, genre):
+            try:
+                service.search_movies_live(name=name or None, genre=genre, movies=movies)
+            except NotFoundError:
+                pass
+
+        async def search_cached(name, genre):
+            try:
+                await service.asearch_movies_cached(name=name or None, genre=genre)
+            except NotFoundError:
+                pass
+
+        async def run():
+            live, cached, lookup = [], [], []
+            for i in range(args.repeat):
+                for name, genre in SEARCHES:
+                    start = time.perf_counter()
+                    search(name, genre)
+                    live.append(time.perf_counter() - start)
+
+                    start = time.perf_counter()
+                    await search_cached(name, genre)
+                    cached.append(time.perf_counter() - start)
+
+                title = movies[i * 7919 % len(movies)]["title"]
+                start = time.perf_counter()
+                service._find_movie(movies, title)
+                lookup.append(time.perf_counter() - start)
+            return live, cached, lookup
+
+        live, cached, lookup = asyncio.run(run())
+
+    return {
+        "catalog": len(movies),
+        "index_build_s": round(index_s, 4),
+        "search_p50_us": round(percentile(live, 50) * 1e6, 1),
+        "search_p95_us": round(percentile(live, 95) * 1e6, 1),
+        "cached_p50_us": round(percentile(cached, 50) * 1e6, 1),
+        "lookup_p50_us": round(percentile(lookup, 50) * 1e6, 2),
+    }
+
+
+def bench_memory(args) -> dict:
+    with replay_server(args) as server, tempfile.TemporaryDirectory() as folder:
+        service = make_service(server, folder, "thread", args.rate_limit)
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            movies = service._get_all_enriched_movies()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "movies": len(movies),
+        "crawl_peak_mib": round((peak - before) / 2**20, 2),
+        "retained_mib": round((current - before) / 2**20, 2),
+    }
+
+
+def bench_catalog(args) -> dict:
+    movies = make_movies(args.catalog)
+    start = time.perf_counter()
+    catalog = MovieCatalog(movies)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(0, len(catalog), 97):
+        catalog[i]
+    read_us = (time.perf_counter() - start) / len(range(0, len(catalog), 97)) * 1e6
+
+    dicts, compact = deep_sizeof(movies), deep_sizeof(catalog)
+    return {
+        **catalog.stats(),
+        "build_s": round(build_s, 4),
+        "read_movie_us": round(read_us, 2),
+        "dicts_mib": round(dicts / 2**20, 2),
+        "catalog_mib": round(compact / 2**20, 2),
+        "ratio": round(dicts / compact, 2),
+    }
+
+
+def bench_startup(args) -> dict:
+    with tempfile.TemporaryDirectory() as folder, replay_server(args) as server:
+        service = make_service(server, folder)
+        MovieCatalog(make_movies(args.catalog)).dump(service.snapshot_path)
+        size = os.path.getsize(service.snapshot_path)
+
+        start = time.perf_counter()
+        warm = service.warm_start()
+        warm_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        service.get_all_genres()
+        first_s = time.perf_counter() - start
+
+    return {
+        "catalog": args.catalog,
+        "snapshot_mib": round(size / 2**20, 2),
+        "warm_start_s": round(warm_s, 4),
+        "first_request_us": round(first_s * 1e6, 1),
+        "upstream_requests": server.counts["requests"],
+    }
+
+
+SCENARIOS = {
+    "crawl": bench_crawl, "parse": bench_parse, "search": bench_search,
+    "memory": bench_memory, "catalog": bench_catalog, "startup": bench_startup,
+}
+
+
+# ==================================================================
+# Results
+# ==================================================================
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def print_results(results, baseline=None) -> None:
+    print(f"{'metric':<32} {'value':>14}" + (f" {'baseline':>14} {'change':>8}" if baseline else ""))
+    for scenario, metrics in results["scenarios"].items():
+        base = (baseline or {}).get("scenarios", {}).get(scenario, {})
+        for name, value in metrics.items():
+            line = f"{scenario + '.' + name:<32} {value:>14}"
+            if baseline and isinstance(base.get(name), (int, float)) and base[name]:
+                line += f" {base[name]:>14} {(value - base[name]) / base[name] * 100:>+7.1f}%"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--engines", nargs="+", choices=["thread", "async", "process"], default=["thread", "async", "process"])
+    parser.add_argument("--latency", type=float, default=0.02, help="replay server latency per response, seconds")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of replayed responses that are 503")
+    parser.add_argument("--rate-limit", type=float, default=1000, help="MovieService rate limit (requests/s per host)")
+    parser.add_argument("--catalog", type=int, default=10000, help="movies in the search, catalog and startup scenarios")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = {"environment": environment(), "arguments": vars(args), "scenarios": {}}
+    for name in args.scenarios:
+        print(f"Running {name}...", file=sys.stderr)
+        results["scenarios"][name] = SCENARIOS[name](args)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import os
+import tempfile
+from benchmarks.replay import ReplayServer
+from benchmarks.suite import make_service
+from app.services.archive import PageArchive
+
+
+def test_enabling_the_archive_refetches_unarchived_pages():
+    with ReplayServer() as server, tempfile.TemporaryDirectory() as folder:
+        make_service(server, folder).snapshot.reload()
+
+        # Validators are stored, but the archive only starts now
+        service = make_service(server, folder)
+        service.archive = PageArchive(folder=os.path.join(folder, "archive"))
+        before = server.counts["not_modified"]
+        movies = service.snapshot.reload()
+        assert server.counts["not_modified"] == before
+        assert set(service.archive.latest()) >= {movie["link"] for movie in movies}
+
+        # Once archived, re-crawls are conditional again
+        service.snapshot.reload()
+        assert server.counts["not_modified"] == before + len(movies)
+
+        reparse = make_service(server, folder, "reparse")
+        reparse.archive = service.archive
+        assert [movie["description"] for movie in reparse._crawl_all_enriched_movies()] == [movie["description"] for movie in movies]
@@ -0,0 +1,11 @@
+from app.services.cache import SnapshotCache
+
+
+def test_invalidate_expires_a_fresh_snapshot():
+    # A TTL longer than the machine's uptime must not keep an invalidated snapshot fresh
+    cache = SnapshotCache(lambda: ["movies"], ttl=10 ** 12)
+    cache.get()
+    assert not cache.is_stale
+
+    cache.invalidate()
+    assert cache.is_stale and cache.has_value
@@ -0,0 +1,63 @@
+import asyncio
+import tempfile
+from benchmarks.replay import ReplayServer
+from benchmarks.suite import make_service
+from app.services.crawler import AsyncCrawlEngine
+
+
+def detail_urls(server, count):
+    return [f"{server.origin}/m/movie_{i}" for i in range(count)]
+
+
+def fetch_all(server, urls, **kwargs):
+    async def run():
+        async with AsyncCrawlEngine(**kwargs) as engine:
+            return await asyncio.gather(*(engine.fetch(url) for url in urls))
+    return asyncio.run(run())
+
+
+def test_per_host_limit_caps_concurrency():
+    with ReplayServer(latency=0.05) as server:
+        pages = fetch_all(server, detail_urls(server, 12), per_host_limit=3)
+
+    assert len(pages) == 12 and all(pages)
+    assert server.counts["max_in_flight"] == 3
+
+
+def test_keepalive_connections_are_reused():
+    with ReplayServer(latency=0.01) as server:
+        fetch_all(server, detail_urls(server, 20), per_host_limit=2)
+
+    assert server.counts["requests"] == 20
+    assert server.counts["connections"] <= 2
+
+
+def test_accept_encoding_is_sent():
+    with ReplayServer() as server:
+        fetch_all(server, [server.base_url])
+
+    assert "gzip" in server.request_headers[-1]["accept-encoding"]
+
+
+def test_conditional_headers_get_not_modified():
+    async def run(url):
+        async with AsyncCrawlEngine() as engine:
+            first = await engine.fetch_response(url)
+            second = await engine.fetch_response(url, {"If-None-Match": first.headers["ETag"]})
+            return first, second
+
+    with ReplayServer() as server:
+        first, second = asyncio.run(run(server.origin + "/m/some_movie"))
+
+    assert first.status_code == 200 and first.content
+    assert second.status_code == 304 and not second.content
+    assert server.counts["not_modified"] == 1
+
+
+def test_async_crawl_matches_thread_crawl():
+    with ReplayServer() as server, tempfile.TemporaryDirectory() as folder:
+        thread_movies = make_service(server, folder, "thread")._crawl_all_enriched_movies()
+        async_movies = asyncio.run(make_service(server, folder, "async")._acrawl_all_enriched_movies())
+
+    assert thread_movies and all(movie.get("cast_crew") for movie in thread_movies)
+    assert async_movies == thread_movies
@@ -0,0 +1,32 @@
+import asyncio
+import tempfile
+from app.services.export import ExportService
+
+
+def movies(count, title):
+    return [{"index": i, "title": f"{title} {i}", "link": f"/m/{title}_{i}"} for i in range(count)]
+
+
+async def body(response):
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+def test_export_response_survives_a_concurrent_rewrite():
+    with tempfile.TemporaryDirectory() as folder:
+        exporter = ExportService(csv_folder=folder)
+        exporter.export_movies(movies(10, "old"), formats=("csv",))
+        with open(exporter.csv_path, "rb") as f:
+            old = f.read()
+
+        for headers in ({}, {"range": "bytes=5-40"}, {"accept-encoding": "gzip"}):
+            response = exporter.export_response("csv", headers)
+            # A snapshot refresh renames a bigger export into place before the body is sent
+            exporter.export_movies(movies(500, "new"), formats=("csv",))
+            content = asyncio.run(body(response))
+
+            assert len(content) == int(response.headers["content-length"])
+            if "range" in headers:
+                assert content == old[5:41]
+            elif not headers:
+                assert content == old
+            exporter.export_movies(movies(10, "old"), formats=("csv",))
@@ -0,0 +1,27 @@
+import tempfile
+from benchmarks.replay import ReplayServer
+from benchmarks.suite import make_service
+from app.services.jobs import JobQueue
+
+
+def test_queue_crawl_survives_a_failing_job():
+    with ReplayServer() as server, tempfile.TemporaryDirectory() as folder:
+        service = make_service(server, folder, "queue")
+        service.job_queue = JobQueue(db_folder=folder, backoff=0.01)
+        parse = service._parse_movie_details
+        broken = []
+
+        def parse_or_fail(html):
+            details = parse(html)
+            if not broken:
+                broken.append(True)
+                raise ValueError("invalid literal for int() with base 10: ''")
+            return details
+
+        service._parse_movie_details = parse_or_fail
+        movies = service._crawl_all_enriched_movies()
+        crawl_id = service.job_queue.current_crawl()
+
+    # The failed attempt was retried and the crawl finished normally
+    assert crawl_id is None
+    assert len(movies) == 100 and all(movie.get("description") for movie in movies)
@@ -0,0 +1,155 @@
+import time
+import asyncio
+import tempfile
+import threading
+from types import SimpleNamespace
+import pytest
+import requests
+from benchmarks.replay import ReplayServer
+from benchmarks.suite import make_service
+from app.schemas.exceptions import CircuitOpenError
+from app.services.crawler import AsyncCrawlEngine
+from app.services.policy import FetchPolicy
+
+
+class Failing:
+    """Replay fault answering the first `times` requests with `status` (times=None: every request)."""
+
+    def __init__(self, status, times=None, headers=None):
+        self.status = status
+        self.times = times
+        self.headers = headers or {}
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, path):
+        with self._lock:
+            self.calls += 1
+            if self.times is None or self.calls <= self.times:
+                return self.status, self.headers
+        return None
+
+
+def get(policy, url):
+    return policy.call(url, lambda: requests.get(url, timeout=5), errors=(requests.ConnectionError,))
+
+
+def test_throttling_halves_rate_then_recovers():
+    with ReplayServer(fault=Failing(429, times=1)) as server:
+        policy = FetchPolicy(rate=100, backoff_base=0.01)
+        assert get(policy, server.base_url).status_code == 200
+        host = policy.stats()["hosts"][server.origin[len("http://"):]]
+        # Halved to 50 by the 429, then one step (max_rate / 50) back up on the retry's success
+        assert host["rate"] == 52
+
+        for _ in range(25):
+            get(policy, server.base_url)
+        assert policy.stats()["hosts"][server.origin[len("http://"):]]["rate"] == 100
+
+
+def test_retry_after_is_honoured():
+    with ReplayServer(fault=Failing(429, times=1, headers={"Retry-After": "1"})) as server:
+        policy = FetchPolicy(rate=1000, backoff_base=0.01)
+        start = time.monotonic()
+        response = get(policy, server.base_url)
+
+    assert response.status_code == 200
+    assert time.monotonic() - start >= 1
+    assert policy.counts["throttled"] == 1 and policy.counts["retries"] == 1
+
+
+def test_retries_are_bounded():
+    with ReplayServer(fault=Failing(503)) as server:
+        policy = FetchPolicy(rate=1000, max_retries=2, backoff_base=0.01, failure_threshold=10)
+        response = get(policy, server.base_url)
+
+    assert response.status_code == 503
+    assert server.counts["requests"] == 3
+    assert policy.counts["attempts"] == 3 and policy.counts["retries"] == 2
+
+
+def test_circuit_opens_and_closes_after_probe():
+    fault = Failing(503)
+    with ReplayServer(fault=fault) as server:
+        policy = FetchPolicy(rate=1000, max_retries=0, failure_threshold=3, reset_timeout=0.2)
+        breaker = policy._host(server.base_url)[1]
+        for _ in range(3):
+            assert get(policy, server.base_url).status_code == 503
+        assert breaker.state == "open"
+
+        with pytest.raises(CircuitOpenError):
+            get(policy, server.base_url)
+        assert server.counts["requests"] == 3 and policy.counts["rejected"] == 1
+
+        time.sleep(0.25)
+        assert breaker.state == "half_open"
+        fault.times = 0
+        assert get(policy, server.base_url).status_code == 200
+        assert breaker.state == "closed" and breaker.failures == 0
+
+
+def test_details_survive_transient_errors():
+    with ReplayServer(fault=Failing(503, times=2)) as server, tempfile.TemporaryDirectory() as folder:
+        service = make_service(server, folder)
+        service.fetch_policy = FetchPolicy(rate=1000, backoff_base=0.01)
+        url = server.origin + "/m/some_movie"
+        details = service._crawl_movie_details(url)
+
+    assert details.get("cast_crew")
+    assert server.counts["errors"] == 2
+
+
+def test_async_details_survive_transient_errors():
+    async def crawl(service, url):
+        async with AsyncCrawlEngine(header=service.header, policy=service.fetch_policy) as engine:
+            return await service._acrawl_movie_details(engine, url)
+
+    with ReplayServer(fault=Failing(503, times=2)) as server, tempfile.TemporaryDirectory() as folder:
+        service = make_service(server, folder, "async")
+        service.fetch_policy = FetchPolicy(rate=1000, backoff_base=0.01)
+        details = asyncio.run(crawl(service, server.origin + "/m/some_movie"))
+
+    assert details.get("cast_crew")
+    assert server.counts["errors"] == 2
+
+
+def open_circuit(policy, url):
+    breaker = policy._host(url)[1]
+    for _ in range(policy.failure_threshold):
+        breaker.record_failure()
+    time.sleep(policy.reset_timeout + 0.05)
+    assert breaker.state == "half_open"
+    return breaker
+
+
+def test_probe_raising_reopens_the_circuit():
+    url = "http://probe.test/page"
+    policy = FetchPolicy(rate=1000, max_retries=0, failure_threshold=2, reset_timeout=0.1)
+    breaker = open_circuit(policy, url)
+
+    def send():
+        raise requests.exceptions.ChunkedEncodingError("connection broken")
+
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        policy.call(url, send, errors=(requests.ConnectionError,))
+    assert breaker.state == "open"
+
+    time.sleep(0.15)
+    assert policy.call(url, lambda: SimpleNamespace(status_code=200, headers={})).status_code == 200
+    assert breaker.state == "closed"
+
+
+def test_cancelled_probe_frees_the_slot():
+    url = "http://probe.test/page"
+    policy = FetchPolicy(rate=1000, max_retries=0, failure_threshold=2, reset_timeout=0.1)
+    breaker = open_circuit(policy, url)
+
+    async def run():
+        task = asyncio.ensure_future(policy.acall(url, lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert breaker.state == "half_open" and breaker.allow()
@@ -0,0 +1,19 @@
+import tempfile
+from app.services.store import MovieStore
+
+
+def movie(link, index, title, genre="drama", cast=None):
+    return {"link": link, "index": index, "title": title, "genre": genre, "cast_crew": cast or []}
+
+
+def test_replace_movies_drops_movies_that_left_the_list():
+    with tempfile.TemporaryDirectory() as folder:
+        store = MovieStore(db_folder=folder)
+        store.replace_movies([movie("/m/a", 1, "A", cast=[{"name": "X", "role": "Director", "img": None}]), movie("/m/b", 2, "B")])
+        store.replace_movies([movie("/m/c", 1, "C", genre="comedy")])
+
+        assert [(m["index"], m["title"]) for m in store.load_movies()] == [(1, "C")]
+        assert store.search_links(genre=["drama"]) == set()
+        assert store.search_links(q="A") == set()
+        with store._connect() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM movie_cast").fetchone()[0] == 0
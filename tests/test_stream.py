@@ -0,0 +1,47 @@
+import asyncio
+import tempfile
+from benchmarks.replay import ReplayServer
+from benchmarks.suite import make_service
+
+
+def test_cold_streams_share_one_crawl():
+    async def collect(service, delay, order):
+        await asyncio.sleep(delay)
+        return [movie async for movie in await service.astream_movies(order=order)]
+
+    async def run(service):
+        return await asyncio.gather(collect(service, 0, "completion"), collect(service, 0, "rank"), collect(service, 0.05, "rank"))
+
+    with ReplayServer(latency=0.02) as server, tempfile.TemporaryDirectory() as folder:
+        service = make_service(server, folder, "async")
+        streams = asyncio.run(run(service))
+        requests = server.counts["requests"]
+
+        assert service.snapshot.has_value
+        snapshot = service.snapshot.get()
+
+    # One list page and one request per movie, however many streams subscribed
+    assert requests == 1 + len(snapshot)
+    assert service.crawl_flight.stats()["executions"] == 1
+    titles = [movie["title"] for movie in snapshot]
+    assert sorted(movie.title for movie in streams[0]) == sorted(titles)
+    assert [movie.title for movie in streams[1]] == titles
+    assert [movie.title for movie in streams[2]] == titles
+    assert all(movie.cast_crew for movie in streams[2])
+
+
+def test_cold_stream_joins_a_load_in_flight():
+    async def run(service):
+        load = asyncio.ensure_future(asyncio.to_thread(service.snapshot.get))
+        await asyncio.sleep(0.05)
+        movies = [movie async for movie in await service.astream_movies()]
+        return movies, await load
+
+    with ReplayServer(latency=0.02) as server, tempfile.TemporaryDirectory() as folder:
+        service = make_service(server, folder)
+        movies, snapshot = asyncio.run(run(service))
+        requests = server.counts["requests"]
+
+    assert requests == 1 + len(snapshot)
+    assert service.crawl_flight.stats()["coalesced"] == 1
+    assert [movie.title for movie in movies] == [movie["title"] for movie in snapshot]